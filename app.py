@@ -8,16 +8,22 @@ Author: SkillBridge Team
 Purpose: Initialize and configure Flask application
 """
 
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# eventlet/gevent mode must patch the standard library before anything
+# else imports it (SOCKETIO_ASYNC_MODE, see async_mode.py)
+from async_mode import patch_for_async_mode, active_async_mode
+patch_for_async_mode()
+
 from flask import Flask, render_template
 from flask_login import LoginManager
 from flask_socketio import SocketIO
 from config import get_config
 from models import db, User
 import os
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
 
 # Initialize Flask-Login and Flask-Mail
 from extensions import login_manager, oauth, socketio
@@ -49,9 +55,29 @@ def create_app(config_name='default'):
     # Initialize extensions
     db.init_app(app)
     login_manager.init_app(app)
-    socketio.init_app(app)
+    
+    # Socket.IO deployment modes (see socketio_queue.py):
+    # - one process: no SOCKETIO_MESSAGE_QUEUE needed
+    # - several workers/instances: set SOCKETIO_MESSAGE_QUEUE (e.g. redis://...)
+    #   so room emits reach clients on every worker, and run each worker with
+    #   an async worker class, e.g.
+    #     gunicorn -k eventlet -w 1 'app:create_app()'    (or -k gevent)
+    #   one worker per gunicorn instance, several instances behind a load
+    #   balancer with sticky sessions (long-polling must reach the same worker)
+    from socketio_queue import socketio_options, describe_queue
+    socketio.init_app(app, async_mode=active_async_mode(), **socketio_options(app.config))
+    print(f"✓ Socket.IO async mode: {socketio.server.eio.async_mode}, "
+          f"message queue: {describe_queue(app.config)}")
     oauth.init_app(app)
     mail.init_app(app)
+    
+    # Select the shared cache backend used by the managers
+    from cache import configure_cache
+    configure_cache(app)
+    
+    # Per-request query counting and N+1 detection
+    from query_stats import init_query_stats
+    init_query_stats(app)
 
     # Register Google OAuth
     oauth.register(
@@ -108,7 +134,8 @@ def create_app(config_name='default'):
     if upload_folder and not os.path.exists(upload_folder):
         os.makedirs(upload_folder)
     
-    # Create database tables
+    # Database setup: each step is guarded on its own, so one failure
+    # (e.g. a schema upgrade) never skips the unrelated steps after it
     with app.app_context():
         try:
             db.create_all()
@@ -120,8 +147,54 @@ def create_app(config_name='default'):
             seed_categories()
             print("✓ Default data initialized")
         except Exception as e:
+            db.session.rollback()
             print(f"⚠️  Database initialization warning: {e}")
             print("   Continuing anyway...")
+        
+        # Add columns/indexes introduced after tables were created
+        # (AUTO_MIGRATE off = run by a release step, see migrations.py)
+        if app.config.get('AUTO_MIGRATE', True):
+            try:
+                from migrations import upgrade_schema
+                upgrade_schema()
+            except Exception as e:
+                db.session.rollback()
+                print(f"⚠️  Schema upgrade warning: {e}")
+        
+        # Recount site-wide totals now and periodically
+        try:
+            from site_counters import start_reconciler
+            start_reconciler(app)
+        except Exception as e:
+            db.session.rollback()
+            print(f"⚠️  Site counter warning: {e}")
+        
+        # Set up full-text search and build in-memory search structures
+        try:
+            from managers import service_manager, search_engine
+            service_manager.configure_search_backend(app)
+            print(f"✓ Search backend: {service_manager.search_backend.name}")
+            search_engine.build_index()
+            print("✓ Search index built")
+        except Exception as e:
+            db.session.rollback()
+            print(f"⚠️  Search initialization warning: {e}")
+        
+        # Share model changes and cache invalidations with other workers
+        try:
+            from invalidation_bus import init_invalidation_bus, invalidation_bus
+            init_invalidation_bus(app, db.engine)
+            print(f"✓ Invalidation bus: {invalidation_bus.transport_name}")
+        except Exception as e:
+            print(f"⚠️  Invalidation bus warning: {e}")
+    
+    # Write buffered service views in periodic batches
+    from view_counter import view_counter
+    view_counter.start(app)
+    
+    # Optionally persist chat messages in background batches
+    from chat_writer import chat_writer
+    chat_writer.start(app)
     
     # Register Socket.IO events
     from events import register_socketio_events
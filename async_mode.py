@@ -0,0 +1,121 @@
+"""
+Cooperative Concurrency (eventlet / gevent) for the Socket.IO Server
+
+In the default 'threading' mode every WebSocket holds an OS thread, and
+under sync gunicorn workers a whole worker. With SOCKETIO_ASYNC_MODE set
+to 'eventlet' or 'gevent', connections are greenlets: one process holds
+thousands of idle chat sockets and switches between them on I/O.
+
+patch_for_async_mode() must run before anything imports socket,
+threading or psycopg2 (app.py calls it first). It:
+1. Monkey-patches the standard library for the selected library
+2. Makes psycopg2 cooperative with psycogreen (a C driver otherwise
+   blocks the whole process while it waits on PostgreSQL)
+3. Raises the open-file limit to its hard maximum (one fd per socket)
+
+Database sessions are scoped per app context AND per greenlet (see
+models._session_scope), so greenlets never share a Session.
+
+Running:
+    SOCKETIO_ASYNC_MODE=eventlet python app.py
+    SOCKETIO_ASYNC_MODE=eventlet gunicorn -k eventlet -w 1 --worker-connections 10000 'app:create_app()'
+    SOCKETIO_ASYNC_MODE=gevent gunicorn -k gevent -w 1 --worker-connections 10000 'app:create_app()'
+(one worker per gunicorn instance; scale out with SOCKETIO_MESSAGE_QUEUE,
+see socketio_queue.py; gunicorn's default of 1000 worker connections
+caps the sockets per process). benchmark_sockets.py measures
+concurrent sockets.
+
+Author: SkillBridge Team
+Purpose: Many concurrent chat sockets per process
+"""
+
+import os
+
+
+ASYNC_MODES = ('threading', 'eventlet', 'gevent')
+
+# Mode in effect after patch_for_async_mode() (None until it runs)
+_active_mode = None
+
+
+def requested_async_mode():
+    """
+    Read SOCKETIO_ASYNC_MODE from the environment
+
+    The environment is used (not app config) because patching happens
+    before the application and its configuration are imported.
+
+    Returns:
+        str: 'threading', 'eventlet' or 'gevent'
+    """
+    mode = os.environ.get('SOCKETIO_ASYNC_MODE', 'threading').strip().lower()
+    if mode not in ASYNC_MODES:
+        print(f"⚠️  Unknown SOCKETIO_ASYNC_MODE '{mode}', using threading")
+        return 'threading'
+    return mode
+
+
+def _raise_file_limit():
+    """Allow as many open sockets as the hard limit permits"""
+    try:
+        import resource
+    except ImportError:
+        return  # Windows
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if hard == resource.RLIM_INFINITY or hard > soft:
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+        except (ValueError, OSError):
+            pass
+
+
+def patch_for_async_mode():
+    """
+    Monkey-patch for the requested async mode (idempotent)
+
+    Falls back to threading, with a warning, if the library is not
+    installed.
+
+    Returns:
+        str: The async mode in effect
+    """
+    global _active_mode
+    if _active_mode is not None:
+        return _active_mode
+
+    mode = requested_async_mode()
+    try:
+        if mode == 'eventlet':
+            import eventlet
+            eventlet.monkey_patch()
+        elif mode == 'gevent':
+            from gevent import monkey
+            monkey.patch_all()
+    except ImportError:
+        print(f"⚠️  SOCKETIO_ASYNC_MODE={mode} but {mode} is not installed, using threading")
+        mode = 'threading'
+
+    if mode != 'threading':
+        try:
+            if mode == 'eventlet':
+                from psycogreen.eventlet import patch_psycopg
+            else:
+                from psycogreen.gevent import patch_psycopg
+            patch_psycopg()
+        except ImportError:
+            # Fine for SQLite; with PostgreSQL every query would block the process
+            print("⚠️  psycogreen/psycopg2 not available: PostgreSQL queries will not yield")
+        _raise_file_limit()
+
+    _active_mode = mode
+    return mode
+
+
+def active_async_mode():
+    """
+    Get the async mode for SocketIO.init_app()
+
+    Returns:
+        str: 'threading', 'eventlet' or 'gevent'
+    """
+    return _active_mode or patch_for_async_mode()
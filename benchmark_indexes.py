@@ -0,0 +1,246 @@
+"""
+Notification and Message Index Benchmark for SkillBridge
+
+Seeds a scratch database with millions of notifications and chat
+messages, then times the manager calls that read them, first without
+and then with the composite indexes declared on the models:
+- idx_notifications_user_read     (user_id, is_read)
+- idx_notifications_user_created  (user_id, created_at DESC)
+- idx_messages_order_created      (order_id, created_at)
+
+Timed calls:
+- NotificationManager.get_user_notifications (latest 10 for a user)
+- NotificationManager.get_unread_count (reads users.unread_notifications)
+  and the unread COUNT(*) behind it (reconcile-unread, mark_all_read)
+- ChatManager.get_messages (full history of one order, oldest first)
+
+The database is created from scratch, so NEVER point this at a real
+database. Existing databases get the indexes from migrations.py.
+
+Usage:
+    python benchmark_indexes.py
+    python benchmark_indexes.py --notifications 5000000 --messages 2000000
+    python benchmark_indexes.py --database postgresql://localhost/skillbridge_bench
+
+Author: SkillBridge Team
+Purpose: Measure the effect of the notification/message indexes
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from flask import Flask
+
+
+INDEXES = ('idx_notifications_user_read', 'idx_notifications_user_created',
+           'idx_messages_order_created')
+
+# Rows per INSERT batch while seeding
+CHUNK = 50000
+
+
+def parse_args():
+    """Command line options"""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--database', help='Scratch database URI (default: SQLite file in the temp directory)')
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--orders', type=int, default=50000)
+    parser.add_argument('--notifications', type=int, default=2000000)
+    parser.add_argument('--messages', type=int, default=1000000)
+    parser.add_argument('--samples', type=int, default=200, help='Calls timed per benchmark')
+    parser.add_argument('--seed', type=int, default=42)
+    return parser.parse_args()
+
+
+def create_bench_app(uri):
+    """
+    Minimal application bound to the scratch database
+
+    create_app() is not used: it seeds data and starts background tasks.
+    """
+    from models import db
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = uri
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    return app
+
+
+def insert_chunked(table, rows, total):
+    """Insert generated rows in CHUNK-sized executemany batches"""
+    from models import db
+
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == CHUNK:
+            db.session.execute(table.insert(), batch)
+            db.session.commit()
+            batch = []
+    if batch:
+        db.session.execute(table.insert(), batch)
+        db.session.commit()
+    print(f"  {table.name}: {total:,} rows")
+
+
+def seed(args):
+    """
+    Fill the scratch database
+
+    Rows are inserted with Core statements (no mapper events), so the
+    denormalized counters are not maintained; only the tables the
+    benchmarked calls read are filled.
+    """
+    from models import db, User, Category, Service, Order, Notification, Message
+
+    rng = random.Random(args.seed)
+    now = datetime.utcnow()
+    year = 365 * 24 * 3600
+
+    def moment():
+        return now - timedelta(seconds=rng.randrange(year))
+
+    print("🔄 Seeding...")
+    started = time.perf_counter()
+
+    db.session.execute(Category.__table__.insert(), [{'id': 1, 'name': 'Benchmark'}])
+    insert_chunked(User.__table__, (
+        {'id': i, 'username': f'user{i}', 'email': f'user{i}@bench.local',
+         'password_hash': '-', 'user_type': 'client', 'unread_notifications': 0}
+        for i in range(1, args.users + 1)
+    ), args.users)
+    db.session.execute(Service.__table__.insert(), [{
+        'id': 1, 'title': 'Benchmark service', 'description': '-', 'price': 10.0,
+        'user_id': 1, 'category_id': 1,
+    }])
+    insert_chunked(Order.__table__, (
+        {'id': i, 'service_id': 1, 'buyer_id': rng.randint(1, args.users),
+         'seller_id': 1, 'total_price': 10.0, 'status': 'in_progress'}
+        for i in range(1, args.orders + 1)
+    ), args.orders)
+    insert_chunked(Notification.__table__, (
+        {'user_id': rng.randint(1, args.users), 'title': 'Benchmark', 'message': '-',
+         'is_read': rng.random() < 0.8, 'created_at': moment()}
+        for _ in range(args.notifications)
+    ), args.notifications)
+    insert_chunked(Message.__table__, (
+        {'order_id': rng.randint(1, args.orders), 'sender_id': 1, 'content': '-',
+         'created_at': moment()}
+        for _ in range(args.messages)
+    ), args.messages)
+
+    print(f"✓ Seeded in {time.perf_counter() - started:.1f} s")
+
+
+def set_indexes(enabled):
+    """Create or drop the benchmarked indexes, then refresh planner statistics"""
+    from models import db
+
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            if index.name not in INDEXES:
+                continue
+            if enabled:
+                index.create(db.engine, checkfirst=True)
+            else:
+                index.drop(db.engine, checkfirst=True)
+    with db.engine.begin() as connection:
+        connection.execute(db.text('ANALYZE'))
+
+
+def measure(call, arguments):
+    """
+    Time one call per argument
+
+    Returns:
+        tuple: (mean ms, p95 ms)
+    """
+    from models import db
+
+    timings = []
+    for argument in arguments:
+        started = time.perf_counter()
+        call(argument)
+        timings.append((time.perf_counter() - started) * 1000)
+        db.session.expire_all()
+    timings.sort()
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    return statistics.mean(timings), p95
+
+
+def run_benchmarks(args):
+    """
+    Time every call without and with the indexes
+
+    Returns:
+        dict: benchmark name -> {False: (mean, p95), True: (mean, p95)}
+    """
+    from models import db, Notification
+    from managers import notification_manager, chat_manager
+
+    rng = random.Random(args.seed + 1)
+    user_ids = [rng.randint(1, args.users) for _ in range(args.samples)]
+    # The order's buyer passes the permission check
+    orders = db.session.execute(
+        db.text('SELECT id, buyer_id FROM orders WHERE id IN ({})'.format(
+            ','.join(str(rng.randint(1, args.orders)) for _ in range(args.samples))))
+    ).all()
+
+    def unread_count_query(user_id):
+        return Notification.query.filter_by(user_id=user_id, is_read=False).count()
+
+    benchmarks = {
+        'get_user_notifications': (notification_manager.get_user_notifications, user_ids),
+        'get_unread_count (column)': (notification_manager.get_unread_count, user_ids),
+        'unread COUNT(*)': (unread_count_query, user_ids),
+        'ChatManager.get_messages': (lambda row: chat_manager.get_messages(row[0], row[1]), orders),
+    }
+
+    results = {name: {} for name in benchmarks}
+    for enabled in (False, True):
+        set_indexes(enabled)
+        print(f"🔄 Timing {'with' if enabled else 'without'} indexes...")
+        for name, (call, arguments) in benchmarks.items():
+            call(arguments[0])  # warm up
+            results[name][enabled] = measure(call, arguments)
+    return results
+
+
+def report(results):
+    """Print the comparison table"""
+    print()
+    print(f"{'call':<28}{'without (mean/p95 ms)':>24}{'with (mean/p95 ms)':>22}{'speedup':>10}")
+    for name, timings in results.items():
+        without, with_ = timings[False], timings[True]
+        speedup = without[0] / with_[0] if with_[0] else float('inf')
+        print(f"{name:<28}{without[0]:>13.2f} / {without[1]:<8.2f}"
+              f"{with_[0]:>11.2f} / {with_[1]:<8.2f}{speedup:>9.1f}x")
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    uri = args.database
+    path = None
+    if not uri:
+        path = os.path.join(tempfile.gettempdir(), 'skillbridge_index_bench.db')
+        if os.path.exists(path):
+            os.remove(path)
+        uri = f'sqlite:///{path}'
+
+    app = create_bench_app(uri)
+    from models import db
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        seed(args)
+        report(run_benchmarks(args))
+        db.session.remove()
+        if path:
+            db.engine.dispose()
+            os.remove(path)
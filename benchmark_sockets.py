@@ -0,0 +1,187 @@
+"""
+Concurrent Socket.IO Connection Benchmark for SkillBridge
+
+Opens thousands of WebSocket connections to one server process, holds
+them open, and reports:
+- how many connected and how many were still connected after the hold
+- connect latency (p50 / p95 / max)
+- server memory (RSS) before and after, and per connection
+
+By default the server (create_app('production') on a scratch SQLite
+database unless DATABASE_URL is set) is started as a subprocess with the
+requested SOCKETIO_ASYNC_MODE, so threading and eventlet/gevent can be
+compared on the same machine:
+
+    python benchmark_sockets.py --mode threading --connections 500
+    python benchmark_sockets.py --mode eventlet --connections 5000
+    python benchmark_sockets.py --url http://localhost:5000 --connections 2000
+
+The clients run in one asyncio loop and need aiohttp
+(pip install aiohttp). Raise the open-file limit of the shell
+(ulimit -n) above the connection count for large runs.
+
+Author: SkillBridge Team
+Purpose: Measure concurrent chat sockets per server process
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+
+# Run in the server subprocess: importing app applies the async mode patch first
+SERVER_CODE = """
+import sys
+from app import create_app, socketio
+app = create_app('production')
+# eventlet's WSGI server serves at most 1024 connections unless told otherwise
+options = {'max_size': 100000} if socketio.async_mode == 'eventlet' else {}
+socketio.run(app, host='127.0.0.1', port=int(sys.argv[1]),
+             allow_unsafe_werkzeug=True, log_output=False, **options)
+"""
+
+
+def parse_args():
+    """Command line options"""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--mode', default='eventlet', choices=('threading', 'eventlet', 'gevent'),
+                        help='SOCKETIO_ASYNC_MODE of the spawned server')
+    parser.add_argument('--url', help='Benchmark a running server instead of spawning one')
+    parser.add_argument('--port', type=int, default=5000, help='Port of the spawned server')
+    parser.add_argument('--connections', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=200, help='Connects in flight at once')
+    parser.add_argument('--hold', type=float, default=10.0, help='Seconds to keep every socket open')
+    return parser.parse_args()
+
+
+def rss_mb(pid):
+    """
+    Resident memory of a process (Linux)
+
+    Returns:
+        float: Megabytes, or None if unavailable
+    """
+    try:
+        with open(f'/proc/{pid}/status') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def spawn_server(mode, port):
+    """
+    Start the application server in the given async mode and wait until
+    it serves
+
+    Returns:
+        subprocess.Popen: The server process
+    """
+    env = dict(os.environ, SOCKETIO_ASYNC_MODE=mode, QUERY_STATS_ENABLED='false')
+    env.setdefault('SECRET_KEY', 'benchmark')
+    env.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(
+        tempfile.gettempdir(), 'skillbridge_socket_bench.db'))
+    here = os.path.dirname(os.path.abspath(__file__))
+    server = subprocess.Popen([sys.executable, '-c', SERVER_CODE, str(port)], cwd=here, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f'http://127.0.0.1:{port}/socket.io/?EIO=4&transport=polling'
+    for _ in range(120):
+        try:
+            urllib.request.urlopen(url, timeout=1)
+            return server
+        except OSError:
+            if server.poll() is not None:
+                raise RuntimeError('Server exited during startup')
+            time.sleep(0.5)
+    server.terminate()
+    raise RuntimeError('Server did not start within 60 s')
+
+
+async def open_connections(url, count, concurrency):
+    """
+    Connect `count` WebSocket clients, `concurrency` at a time
+
+    Returns:
+        tuple: (connected clients, connect latencies in ms, failures)
+    """
+    import socketio
+
+    clients, latencies = [], []
+    failures = 0
+    limit = asyncio.Semaphore(concurrency)
+
+    async def connect():
+        nonlocal failures
+        client = socketio.AsyncClient(reconnection=False)
+        async with limit:
+            started = time.perf_counter()
+            try:
+                await client.connect(url, transports=['websocket'], wait_timeout=30)
+            except Exception:
+                failures += 1
+                return
+            latencies.append((time.perf_counter() - started) * 1000)
+            clients.append(client)
+
+    await asyncio.gather(*(connect() for _ in range(count)))
+    return clients, latencies, failures
+
+
+async def run(url, args, server_pid):
+    """Connect, hold, verify and disconnect; print the report"""
+    baseline = rss_mb(server_pid) if server_pid else None
+
+    started = time.perf_counter()
+    clients, latencies, failures = await open_connections(url, args.connections, args.concurrency)
+    elapsed = time.perf_counter() - started
+    print(f"✓ {len(clients)} / {args.connections} connected in {elapsed:.1f} s "
+          f"({len(clients) / elapsed:.0f} connects/s), {failures} failed")
+
+    await asyncio.sleep(args.hold)
+    alive = sum(1 for client in clients if client.connected)
+    loaded = rss_mb(server_pid) if server_pid else None
+
+    await asyncio.gather(*(client.disconnect() for client in clients), return_exceptions=True)
+
+    print(f"✓ {alive} still connected after {args.hold:.0f} s")
+    if latencies:
+        latencies.sort()
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        print(f"  connect latency: p50 {statistics.median(latencies):.1f} ms, "
+              f"p95 {p95:.1f} ms, max {latencies[-1]:.1f} ms")
+    if baseline is not None and loaded is not None:
+        per_socket = (loaded - baseline) * 1024 / alive if alive else 0
+        print(f"  server RSS: {baseline:.0f} MB idle -> {loaded:.0f} MB "
+              f"({per_socket:.0f} KB per connection)")
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    try:
+        import resource
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    except (ImportError, ValueError, OSError):
+        pass
+
+    server = None
+    url = args.url
+    if not url:
+        print(f"🔄 Starting server (SOCKETIO_ASYNC_MODE={args.mode})...")
+        server = spawn_server(args.mode, args.port)
+        url = f'http://127.0.0.1:{args.port}'
+
+    try:
+        asyncio.run(run(url, args, server.pid if server else None))
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
@@ -0,0 +1,537 @@
+"""
+Shared Cache Layer for SkillBridge
+
+This module demonstrates:
+1. Data Structures: Ordered Dictionary (LRU list), Dictionary
+2. OOP Concepts: POLYMORPHISM - interchangeable storage backends
+3. Caching: TTL expiry, LRU eviction, namespaced invalidation, metrics
+
+Layout:
+- MemoryCacheBackend: in-process LRU with TTL and a size bound (default)
+- SQLiteCacheBackend: file-backed store shared by every process on the
+  host (e.g. all gunicorn workers), selected with CACHE_BACKEND='sqlite'
+- Cache: a NAMESPACE over the active backend ("services", "categories"),
+  with get_or_set() (single-flight, stale-while-revalidate), invalidate()
+  and hit/miss counters
+
+Invalidations are announced to on_invalidate() listeners (the
+cross-worker invalidation bus), so per-process caches in other workers
+drop the same keys.
+
+Managers create their namespaces at import time with get_cache(); the
+backend is chosen later by configure_cache(app), and namespaces always
+use whichever backend is active.
+
+Cached values should be plain data (dicts, lists, numbers), never ORM
+objects: they outlive the session, and the SQLite backend pickles them.
+
+Author: SkillBridge Team
+Purpose: One cache subsystem for all manager singletons
+"""
+
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+# Returned by backends when a key is absent or expired
+MISS = object()
+
+
+class MemoryCacheBackend:
+    """
+    In-process LRU cache with per-entry TTL
+
+    Data Structure: ORDERED DICTIONARY key -> (expires_at, value);
+    the most recently used key is moved to the end, the least recently
+    used key is evicted from the front when max_entries is exceeded.
+
+    Time Complexity: O(1) get/set, O(n) delete_prefix
+    """
+
+    name = 'memory'
+
+    def __init__(self, max_entries=1024):
+        """
+        Args:
+            max_entries (int): Size bound
+        """
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key):
+        """Get a value, or MISS if absent or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISS
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[key]
+                return MISS
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        """Store a value for `ttl` seconds (None = until evicted)"""
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        """Remove one key"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def delete_prefix(self, prefix):
+        """Remove every key starting with `prefix`"""
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+
+    def clear(self):
+        """Remove everything"""
+        with self._lock:
+            self._entries.clear()
+
+    def size(self):
+        """Number of stored entries (including expired, not yet purged)"""
+        with self._lock:
+            return len(self._entries)
+
+
+class SQLiteCacheBackend:
+    """
+    Cross-process cache stored in a local SQLite file
+
+    Every process on the host opens the same file, so a value computed
+    (or invalidated) by one gunicorn worker is seen by all of them.
+
+    DBMS Concepts: WAL journal for concurrent readers, PRIMARY KEY lookup,
+    index on accessed_at so the oldest-accessed rows can be evicted past
+    max_entries (approximate LRU). A hit only rewrites accessed_at when it
+    is older than ACCESS_REFRESH seconds, so hot keys are read without a
+    write transaction per hit.
+
+    A failing cache file (locked, full disk, corrupt entry) never fails
+    the caller: errors are logged, reads count as misses (Cache then runs
+    the creator) and writes are skipped.
+    """
+
+    name = 'sqlite'
+
+    # Seconds before a hit refreshes accessed_at (LRU precision)
+    ACCESS_REFRESH = 60
+
+    def __init__(self, path, max_entries=10000):
+        """
+        Args:
+            path (str): Database file
+            max_entries (int): Size bound
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self.evictions = 0
+        connection = self._connection()
+        with connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, "
+                "expires_at REAL, accessed_at REAL NOT NULL)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS idx_cache_accessed ON cache_entries (accessed_at)"
+            )
+
+    def _connection(self):
+        """One connection per thread (sqlite3 connections are not shared)"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    @staticmethod
+    def _warn(operation, error):
+        """Report a cache file error (the operation is skipped)"""
+        print(f"⚠️  SQLite cache {operation} failed: {error}")
+
+    def get(self, key):
+        """Get a value, or MISS if absent, expired or unreadable"""
+        try:
+            connection = self._connection()
+            row = connection.execute(
+                "SELECT value, expires_at, accessed_at FROM cache_entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return MISS
+            value, expires_at, accessed_at = row
+            now = time.time()
+            if expires_at is not None and expires_at <= now:
+                connection.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+                return MISS
+            if now - accessed_at > self.ACCESS_REFRESH:
+                connection.execute("UPDATE cache_entries SET accessed_at = ? WHERE key = ?", (now, key))
+            return pickle.loads(value)
+        except (sqlite3.Error, pickle.UnpicklingError) as e:
+            self._warn('read', e)
+            return MISS
+
+    def set(self, key, value, ttl=None):
+        """Store a value for `ttl` seconds (None = until evicted)"""
+        now = time.time()
+        try:
+            connection = self._connection()
+            with connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO cache_entries (key, value, expires_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, pickle.dumps(value), now + ttl if ttl else None, now)
+                )
+                overflow = connection.execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0] \
+                    - self.max_entries
+                if overflow > 0:
+                    connection.execute(
+                        "DELETE FROM cache_entries WHERE key IN ("
+                        "SELECT key FROM cache_entries ORDER BY accessed_at LIMIT ?)",
+                        (overflow,)
+                    )
+                    self.evictions += overflow
+        except sqlite3.Error as e:
+            self._warn('write', e)
+
+    def delete(self, key):
+        """Remove one key"""
+        try:
+            self._connection().execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+        except sqlite3.Error as e:
+            self._warn('delete', e)
+
+    def delete_prefix(self, prefix):
+        """Remove every key starting with `prefix`"""
+        try:
+            self._connection().execute(
+                "DELETE FROM cache_entries WHERE substr(key, 1, ?) = ?", (len(prefix), prefix)
+            )
+        except sqlite3.Error as e:
+            self._warn('delete', e)
+
+    def clear(self):
+        """Remove everything"""
+        try:
+            self._connection().execute("DELETE FROM cache_entries")
+        except sqlite3.Error as e:
+            self._warn('clear', e)
+
+    def size(self):
+        """Number of stored entries (0 if the file cannot be read)"""
+        try:
+            return self._connection().execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0]
+        except sqlite3.Error as e:
+            self._warn('count', e)
+            return 0
+
+
+class Cache:
+    """
+    A cache NAMESPACE with metrics
+
+    Keys are stored as "<namespace>:<key>", so one namespace can be
+    invalidated without touching the others.
+
+    Stampede protection (get_or_set):
+    - SINGLE-FLIGHT: on a miss only one caller per process runs the
+      creator; concurrent callers wait for its result
+    - STALE-WHILE-REVALIDATE: for `stale_ttl` seconds after a value
+      expires, one caller refreshes it while the others keep getting the
+      previous value immediately
+    """
+
+    def __init__(self, namespace, ttl=300, stale_ttl=0):
+        """
+        Args:
+            namespace (str): Namespace name
+            ttl (int): Default time-to-live in seconds
+            stale_ttl (int): Seconds an expired value may still be served
+                             while it is being recomputed
+        """
+        self.namespace = namespace
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._prefix = f"{namespace}:"
+        self._lock = threading.Lock()
+        # Bumped by every invalidation; get_or_set does not store a value
+        # computed across an invalidation (it may already be stale)
+        self._generation = 0
+        # Keys being computed in this process: key -> threading.Event
+        self._inflight = {}
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.waits = 0
+        self.sets = 0
+        self.invalidations = 0
+
+    def _read(self, key):
+        """
+        Read an entry from the backend
+
+        Returns:
+            tuple: (value, fresh) or (MISS, False)
+        """
+        entry = _backend.get(self._prefix + str(key))
+        if entry is MISS:
+            return MISS, False
+        fresh_until, value = entry
+        return value, fresh_until > time.time()
+
+    def get(self, key, default=None):
+        """
+        Get a cached value (only while fresh)
+
+        Args:
+            key (str): Key within the namespace
+            default: Returned on a miss
+
+        Returns:
+            Cached value or default
+        """
+        value, fresh = self._read(key)
+        with self._lock:
+            if value is MISS or not fresh:
+                self.misses += 1
+                return default
+            self.hits += 1
+        return value
+
+    def set(self, key, value, ttl=None):
+        """
+        Store a value
+
+        Args:
+            key (str): Key within the namespace
+            value: Plain data to cache
+            ttl (int): Time-to-live in seconds (default: namespace TTL)
+        """
+        ttl = ttl or self.ttl
+        # The backend keeps the entry through the stale window as well
+        _backend.set(self._prefix + str(key), (time.time() + ttl, value),
+                     ttl + self.stale_ttl)
+        with self._lock:
+            self.sets += 1
+
+    def get_or_set(self, key, creator, ttl=None):
+        """
+        Get a cached value, computing and storing it on a miss
+
+        Args:
+            key (str): Key within the namespace
+            creator (callable): Computes the value
+            ttl (int): Time-to-live in seconds
+
+        Returns:
+            Cached or freshly computed value
+        """
+        while True:
+            value, fresh = self._read(key)
+            with self._lock:
+                if value is not MISS and fresh:
+                    self.hits += 1
+                    return value
+
+                inflight = self._inflight.get(key)
+                if inflight is None:
+                    # This caller computes; everyone else waits or reads stale
+                    inflight = threading.Event()
+                    self._inflight[key] = inflight
+                    self.misses += 1
+                    generation = self._generation
+                    break
+
+                if value is not MISS:
+                    # Someone is refreshing; serve the previous value
+                    self.stale_hits += 1
+                    return value
+                self.waits += 1
+
+            # Nothing to serve yet: wait for the computing caller, then
+            # read again (compute ourselves if it failed)
+            inflight.wait()
+
+        try:
+            value = creator()
+            with self._lock:
+                store = generation == self._generation
+            if store:
+                self.set(key, value, ttl)
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            inflight.set()
+
+    def invalidate(self, key=None, broadcast=True):
+        """
+        Invalidate one key, or the whole namespace when key is None
+
+        Invalidated entries are deleted, not marked stale: after a write
+        the next reader waits for a fresh value instead of the old one.
+
+        Args:
+            key (str): Key within the namespace
+            broadcast (bool): Announce to on_invalidate() listeners; pass
+                False when every process performs the same invalidation
+        """
+        if key is None:
+            _backend.delete_prefix(self._prefix)
+        else:
+            _backend.delete(self._prefix + str(key))
+        with self._lock:
+            self._generation += 1
+            self.invalidations += 1
+
+        if broadcast:
+            for callback in _invalidation_listeners:
+                try:
+                    callback(self.namespace, key)
+                except Exception as e:
+                    print(f"⚠️  Cache invalidation listener failed: {e}")
+
+    def metrics(self):
+        """
+        Get hit/miss counters
+
+        Returns:
+            dict: Counters and hit ratio
+        """
+        with self._lock:
+            # Waiters retry after the wait and are counted again there
+            lookups = self.hits + self.misses + self.stale_hits
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'stale_hits': self.stale_hits,
+                'waits': self.waits,
+                'hit_ratio': round((self.hits + self.stale_hits) / lookups, 3) if lookups else None,
+                'sets': self.sets,
+                'invalidations': self.invalidations,
+                'ttl': self.ttl,
+                'stale_ttl': self.stale_ttl,
+            }
+
+
+# Active storage backend (replaced by configure_cache)
+_backend = MemoryCacheBackend()
+
+# Registered namespaces: name -> Cache
+_caches = {}
+_caches_lock = threading.Lock()
+
+# Callbacks told about invalidations: callback(namespace, key)
+_invalidation_listeners = []
+
+
+def on_invalidate(callback):
+    """
+    Register a callback for cache invalidations
+
+    Args:
+        callback (callable): Called with (namespace, key); key is None
+                             for a whole namespace
+
+    Returns:
+        callable: The same callback
+    """
+    _invalidation_listeners.append(callback)
+    return callback
+
+
+def get_cache(namespace, ttl=300, stale_ttl=0):
+    """
+    Get (or create) a cache namespace
+
+    Args:
+        namespace (str): Namespace name
+        ttl (int): Default time-to-live in seconds
+        stale_ttl (int): Stale-while-revalidate window in seconds
+
+    Returns:
+        Cache: The namespace
+    """
+    with _caches_lock:
+        cache = _caches.get(namespace)
+        if cache is None:
+            cache = Cache(namespace, ttl, stale_ttl)
+            _caches[namespace] = cache
+        return cache
+
+
+def configure_cache(app):
+    """
+    Select the cache backend from configuration
+
+    Config:
+        CACHE_BACKEND (str): 'memory' (default) or 'sqlite'
+        CACHE_MAX_ENTRIES (int): Size bound
+        CACHE_SQLITE_PATH (str): File for the sqlite backend
+
+    Args:
+        app: Flask application
+    """
+    global _backend
+
+    name = (app.config.get('CACHE_BACKEND') or 'memory').lower()
+    max_entries = app.config.get('CACHE_MAX_ENTRIES', 1024)
+
+    if name == 'sqlite':
+        path = app.config.get('CACHE_SQLITE_PATH') or os.path.join(app.instance_path, 'cache.sqlite')
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            _backend = SQLiteCacheBackend(path, max_entries)
+            return
+        except (OSError, sqlite3.Error) as e:
+            print(f"⚠️  SQLite cache unavailable, using in-process cache: {e}")
+
+    _backend = MemoryCacheBackend(max_entries)
+
+
+def invalidate_all(broadcast=True):
+    """
+    Invalidate every namespace
+
+    Args:
+        broadcast (bool): Announce to on_invalidate() listeners
+    """
+    with _caches_lock:
+        caches = list(_caches.values())
+    for cache in caches:
+        cache.invalidate(broadcast=broadcast)
+
+
+def cache_metrics():
+    """
+    Get metrics for the backend and every namespace
+
+    Returns:
+        dict: Backend info and per-namespace counters
+    """
+    with _caches_lock:
+        caches = dict(_caches)
+    return {
+        'backend': _backend.name,
+        'entries': _backend.size(),
+        'evictions': _backend.evictions,
+        'namespaces': {name: cache.metrics() for name, cache in caches.items()},
+    }
@@ -0,0 +1,236 @@
+"""
+Chat Authorization Cache for SkillBridge
+
+Joining an order's chat room checks that the user is the order's buyer
+or seller. The result is remembered per Socket.IO connection, so every
+message sent afterwards is a single INSERT instead of SELECT order +
+INSERT.
+
+Design:
+- DICTIONARY connection sid -> SET of authorized order IDs, plus the
+  reverse index order ID -> SET of sids for revocation
+- Order mapper events record orders whose buyer/seller changed or that
+  were deleted; after COMMIT their grants are revoked in this process
+  and forwarded to the other workers (invalidation bus)
+- A per-order generation counter makes revocation win over a join that
+  was checking the database at the same moment
+
+Author: SkillBridge Team
+Purpose: Authorize chat sends without a query per message
+"""
+
+import threading
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+from models import Order
+
+
+# Key under which revoked order IDs are stored in Session.info
+_REVOKED_KEY = 'skillbridge_revoked_orders'
+
+# Callbacks that send local revocations to other processes
+_revocation_forwarders = []
+
+
+class ChatAccessCache:
+    """
+    Per-connection (sid, order_id) chat authorization grants
+    """
+
+    def __init__(self):
+        self._orders_by_sid = {}    # sid -> set of order IDs
+        self._sids_by_order = {}    # order ID -> set of sids
+        self._generations = {}      # order ID -> revocation count
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.revocations = 0
+
+    def generation(self, order_id):
+        """
+        Get the order's revocation generation; pass it to grant() after
+        checking the database
+
+        Args:
+            order_id (int): Order ID
+
+        Returns:
+            int: Generation token
+        """
+        with self._lock:
+            return self._generations.get(order_id, 0)
+
+    def grant(self, sid, order_id, generation):
+        """
+        Remember that a connection may chat in an order
+
+        Args:
+            sid (str): Socket.IO connection ID
+            order_id (int): Order ID
+            generation (int): Token from generation(), taken before the check
+
+        Returns:
+            bool: False if the order was revoked meanwhile (nothing stored)
+        """
+        with self._lock:
+            if self._generations.get(order_id, 0) != generation:
+                return False
+            self._orders_by_sid.setdefault(sid, set()).add(order_id)
+            self._sids_by_order.setdefault(order_id, set()).add(sid)
+            return True
+
+    def allowed(self, sid, order_id):
+        """
+        Check a grant (O(1), no database access)
+
+        Args:
+            sid (str): Socket.IO connection ID
+            order_id (int): Order ID
+
+        Returns:
+            bool: True if the connection was authorized for the order
+        """
+        with self._lock:
+            allowed = order_id in self._orders_by_sid.get(sid, ())
+            if allowed:
+                self.hits += 1
+            else:
+                self.misses += 1
+            return allowed
+
+    def forget(self, sid, order_id=None):
+        """
+        Drop a connection's grants (on leave or disconnect)
+
+        Args:
+            sid (str): Socket.IO connection ID
+            order_id (int): Only this order (None = every order)
+        """
+        with self._lock:
+            orders = self._orders_by_sid.get(sid, set())
+            for order in ([order_id] if order_id is not None else list(orders)):
+                orders.discard(order)
+                sids = self._sids_by_order.get(order)
+                if sids is not None:
+                    sids.discard(sid)
+                    if not sids:
+                        del self._sids_by_order[order]
+            if not orders:
+                self._orders_by_sid.pop(sid, None)
+
+    def revoke_order(self, order_id):
+        """
+        Drop every connection's grant for an order
+
+        Args:
+            order_id (int): Order ID
+        """
+        with self._lock:
+            self._generations[order_id] = self._generations.get(order_id, 0) + 1
+            self.revocations += 1
+            for sid in self._sids_by_order.pop(order_id, ()):
+                orders = self._orders_by_sid.get(sid)
+                if orders is not None:
+                    orders.discard(order_id)
+                    if not orders:
+                        del self._orders_by_sid[sid]
+
+    def revoke_all(self):
+        """
+        Drop every grant (revocations from other workers may have been
+        missed); connections are checked against the database again
+        """
+        with self._lock:
+            order_ids = list(self._sids_by_order)
+        for order_id in order_ids:
+            self.revoke_order(order_id)
+
+    def metrics(self):
+        """
+        Get cache counters
+
+        Returns:
+            dict: Connections, grants, hits, misses and revocations
+        """
+        with self._lock:
+            return {
+                'connections': len(self._orders_by_sid),
+                'grants': sum(len(orders) for orders in self._orders_by_sid.values()),
+                'hits': self.hits,
+                'misses': self.misses,
+                'revocations': self.revocations,
+            }
+
+
+# Singleton cache for this process
+chat_access = ChatAccessCache()
+
+
+def forward_revocations(callback):
+    """
+    Register a callback that publishes committed revocations elsewhere
+
+    Args:
+        callback (callable): Function accepting a list of order IDs
+
+    Returns:
+        callable: The same callback
+    """
+    _revocation_forwarders.append(callback)
+    return callback
+
+
+def apply_remote_revocations(order_ids):
+    """
+    Revoke orders changed by another process
+
+    Args:
+        order_ids (list): Order IDs
+    """
+    for order_id in order_ids:
+        chat_access.revoke_order(order_id)
+
+
+def _record_revocation(target):
+    """Remember an order whose participants changed in this transaction"""
+    session = object_session(target)
+    if session is None or target.id is None:
+        return
+    session.info.setdefault(_REVOKED_KEY, set()).add(target.id)
+
+
+@event.listens_for(Order, 'after_update')
+def _order_updated(mapper, connection, target):
+    """Revoke grants when an order changes hands"""
+    state = inspect(target)
+    if state.attrs.buyer_id.history.has_changes() or state.attrs.seller_id.history.has_changes():
+        _record_revocation(target)
+
+
+@event.listens_for(Order, 'after_delete')
+def _order_deleted(mapper, connection, target):
+    """Revoke grants of a deleted order"""
+    _record_revocation(target)
+
+
+@event.listens_for(Session, 'after_commit')
+def _dispatch_revocations(session):
+    """Apply committed revocations here and forward them"""
+    revoked = session.info.pop(_REVOKED_KEY, None)
+    if not revoked:
+        return
+
+    order_ids = sorted(revoked)
+    for order_id in order_ids:
+        chat_access.revoke_order(order_id)
+    for callback in _revocation_forwarders:
+        try:
+            callback(order_ids)
+        except Exception as e:
+            print(f"⚠️  Chat revocation forwarder failed: {e}")
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_revocations(session):
+    """Forget revocations from a rolled back transaction"""
+    session.info.pop(_REVOKED_KEY, None)
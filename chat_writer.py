@@ -0,0 +1,287 @@
+"""
+Write-Behind Chat Persistence for SkillBridge
+
+With CHAT_WRITE_BEHIND enabled, a chat message is given its uid and
+broadcast right away; the row is written later, in batches, by a
+background flusher instead of one commit per message.
+
+Design:
+- Bounded DEQUE of pending rows (CHAT_WRITE_BUFFER_SIZE); when it is
+  full, enqueue() refuses and the caller writes synchronously, so a
+  message is never lost to back-pressure
+- The flusher runs every CHAT_FLUSH_INTERVAL seconds and inserts up to
+  CHAT_FLUSH_BATCH_SIZE rows per transaction with one executemany
+  (multi-row VALUES batches on PostgreSQL)
+- A failed batch goes back to the front of the queue and is retried
+  with exponential backoff (0.5 s doubling up to 30 s); after
+  CHAT_FLUSH_RETRIES failures it is written row by row, and only rows
+  that fail on their own (e.g. their order was deleted) are dropped
+- messages.uid is unique, so a batch that committed but reported an
+  error is not written twice; such a batch is recognized by its uid and
+  counted as persisted, not retried or dropped
+- The buffer is flushed completely when the process exits
+
+Pending messages reach the database (and get_history) within one flush
+interval.
+
+Author: SkillBridge Team
+Purpose: Take chat commits off the Socket.IO handler path
+"""
+
+import atexit
+import threading
+import time
+from collections import deque
+from extensions import socketio
+
+
+class ChatWriter:
+    """
+    Bounded chat message buffer with batched background inserts
+    """
+
+    # Seconds before retrying a failed batch: doubled per failure up to the cap
+    RETRY_DELAY = 0.5
+    MAX_RETRY_DELAY = 30
+
+    def __init__(self):
+        self._pending = deque()   # (row dict, enqueue time)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._app = None
+        self.max_pending = 10000
+        self.batch_size = 500
+        self.max_retries = 3
+        self._failures = 0        # consecutive failures of the head batch
+        self._retry_at = 0.0      # no flush before this time (backoff)
+        self._metrics = {
+            'enqueued': 0,
+            'persisted': 0,
+            'dropped': 0,
+            'rejected': 0,
+            'batches': 0,
+            'retries': 0,
+            'max_batch_size': 0,
+            'max_latency_ms': 0.0,
+            'total_latency_ms': 0.0,
+        }
+
+    @property
+    def enabled(self):
+        """True once start() has enabled write-behind"""
+        return self._app is not None
+
+    def enqueue(self, row):
+        """
+        Buffer one message row for the next flush
+
+        Args:
+            row (dict): messages columns (uid, order_id, sender_id, content, created_at)
+
+        Returns:
+            bool: False if the buffer is full (write the message synchronously)
+        """
+        with self._lock:
+            if len(self._pending) >= self.max_pending:
+                self._metrics['rejected'] += 1
+                return False
+            self._pending.append((row, time.perf_counter()))
+            self._metrics['enqueued'] += 1
+            return True
+
+    def pending(self):
+        """
+        Get the number of buffered messages
+
+        Returns:
+            int: Messages not yet written
+        """
+        with self._lock:
+            return len(self._pending)
+
+    def _take(self):
+        """Remove the next batch from the front of the queue"""
+        with self._lock:
+            count = min(self.batch_size, len(self._pending))
+            return [self._pending.popleft() for _ in range(count)]
+
+    def _give_back(self, batch):
+        """Put a failed batch back at the front of the queue, in order"""
+        with self._lock:
+            self._pending.extendleft(reversed(batch))
+
+    def _insert(self, rows):
+        """Insert rows in one transaction"""
+        from models import db, Message
+
+        db.session.execute(db.insert(Message), rows)
+        db.session.commit()
+
+    def _committed(self, rows):
+        """
+        Check whether rows reported as failed were committed anyway (the
+        error came after the COMMIT), by their unique uids
+
+        Returns:
+            bool: True if every row is in the database
+        """
+        from models import db, Message
+
+        uids = [row['uid'] for row in rows]
+        try:
+            return db.session.query(db.func.count(Message.id))\
+                .filter(Message.uid.in_(uids)).scalar() == len(uids)
+        except Exception:
+            db.session.rollback()
+            return False
+
+    def _insert_one_by_one(self, batch):
+        """
+        Write a batch that keeps failing row by row
+
+        Returns:
+            int: Rows written
+        """
+        from models import db
+
+        written = 0
+        for row, _ in batch:
+            try:
+                self._insert([row])
+            except Exception as e:
+                db.session.rollback()
+                if not self._committed([row]):
+                    self._metrics['dropped'] += 1
+                    print(f"⚠️  Chat message {row.get('uid')} dropped: {e}")
+                    continue
+            written += 1
+        return written
+
+    def _record(self, batch, written):
+        """Update batch size and enqueue-to-commit latency metrics"""
+        now = time.perf_counter()
+        metrics = self._metrics
+        metrics['batches'] += 1
+        metrics['persisted'] += written
+        metrics['max_batch_size'] = max(metrics['max_batch_size'], len(batch))
+        for _, enqueued_at in batch:
+            latency = (now - enqueued_at) * 1000
+            metrics['total_latency_ms'] += latency
+            metrics['max_latency_ms'] = max(metrics['max_latency_ms'], latency)
+
+    def flush(self, wait_for_backoff=True):
+        """
+        Write buffered messages in batches until the buffer is empty or a
+        batch fails
+
+        Must be called inside an application context.
+
+        Args:
+            wait_for_backoff (bool): Skip the flush while a failed batch
+                                     is backing off
+
+        Returns:
+            int: Messages written
+        """
+        from models import db
+
+        written = 0
+        with self._flush_lock:
+            if wait_for_backoff and time.monotonic() < self._retry_at:
+                return 0
+            while True:
+                batch = self._take()
+                if not batch:
+                    break
+                rows = [row for row, _ in batch]
+                try:
+                    self._insert(rows)
+                    failed = None
+                except Exception as e:
+                    db.session.rollback()
+                    failed = None if self._committed(rows) else e
+
+                if failed is not None:
+                    self._failures += 1
+                    if self._failures <= self.max_retries:
+                        delay = min(self.RETRY_DELAY * 2 ** (self._failures - 1), self.MAX_RETRY_DELAY)
+                        self._retry_at = time.monotonic() + delay
+                        self._metrics['retries'] += 1
+                        self._give_back(batch)
+                        print(f"⚠️  Chat flush failed (attempt {self._failures}), "
+                              f"retrying in {delay:.1f} s: {failed}")
+                        break
+                    count = self._insert_one_by_one(batch)
+                else:
+                    count = len(batch)
+
+                self._failures = 0
+                self._retry_at = 0.0
+                self._record(batch, count)
+                written += count
+        return written
+
+    def metrics(self):
+        """
+        Get write-behind metrics
+
+        Returns:
+            dict: Counters, pending messages, batch sizes and latencies
+        """
+        metrics = dict(self._metrics)
+        total_latency = metrics.pop('total_latency_ms')
+        metrics['enabled'] = self.enabled
+        metrics['pending'] = self.pending()
+        metrics['avg_batch_size'] = round(metrics['persisted'] / metrics['batches'], 1) \
+            if metrics['batches'] else 0
+        metrics['avg_latency_ms'] = round(total_latency / metrics['persisted'], 1) \
+            if metrics['persisted'] else 0.0
+        metrics['max_latency_ms'] = round(metrics['max_latency_ms'], 1)
+        return metrics
+
+    def _flush_in_app(self, wait_for_backoff=True):
+        """Flush inside the application context"""
+        from models import db
+
+        with self._app.app_context():
+            try:
+                self.flush(wait_for_backoff)
+            finally:
+                db.session.remove()
+
+    def _drain(self):
+        """Exit hook: flush until everything is written (or keeps failing)"""
+        for _ in range(self.max_retries + 2):
+            if not self.pending():
+                return
+            # Short pause between attempts instead of the full backoff
+            time.sleep(min(max(self._retry_at - time.monotonic(), 0), 1))
+            self._flush_in_app(wait_for_backoff=False)
+        if self.pending():
+            print(f"⚠️  {self.pending()} chat messages could not be written at exit")
+
+    def _run(self, interval):
+        """Background task: flush every `interval` seconds"""
+        while True:
+            socketio.sleep(interval)
+            self._flush_in_app()
+
+    def start(self, app):
+        """
+        Enable write-behind (if CHAT_WRITE_BEHIND) and start flushing
+
+        Args:
+            app: Flask application (CHAT_* config)
+        """
+        if self._app is not None or not app.config.get('CHAT_WRITE_BEHIND', False):
+            return
+        self.max_pending = app.config.get('CHAT_WRITE_BUFFER_SIZE', 10000)
+        self.batch_size = app.config.get('CHAT_FLUSH_BATCH_SIZE', 500)
+        self.max_retries = app.config.get('CHAT_FLUSH_RETRIES', 3)
+        self._app = app
+        socketio.start_background_task(self._run, app.config.get('CHAT_FLUSH_INTERVAL', 0.5))
+        atexit.register(self._drain)
+
+
+# Singleton buffer shared by every connection in this process
+chat_writer = ChatWriter()
@@ -8,8 +8,8 @@ from flask import request
 from flask_login import current_user
 from flask_socketio import emit, join_room, leave_room
 from models import db, Message, Order
-from managers import chat_manager
-import pytz
+from managers import chat_manager, notification_manager
+from chat_access import chat_access
 
 def register_socketio_events(socketio):
     """Register all socket.io event handlers"""
@@ -18,11 +18,14 @@ def register_socketio_events(socketio):
     def handle_connect():
         """Handle client connection"""
         if current_user.is_authenticated:
+            # Personal room for pushed notifications
+            join_room(notification_manager.room_for(current_user.id))
             print(f'User {current_user.username} connected')
         
     @socketio.on('disconnect')
     def handle_disconnect():
         """Handle client disconnection"""
+        chat_access.forget(request.sid)
         if current_user.is_authenticated:
             print(f'User {current_user.username} disconnected')
     
@@ -38,9 +41,8 @@ def register_socketio_events(socketio):
             if not order_id:
                 return
             
-            # Verify user is part of this order
-            order = Order.query.get(order_id)
-            if not order or current_user.id not in [order.buyer_id, order.seller_id]:
+            # Verify user is part of this order (remembered for this connection)
+            if not chat_manager.authorize(request.sid, order_id, current_user.id):
                 print(f"❌ User {current_user.username} unauthorized for order {order_id}")
                 return
             
@@ -61,10 +63,34 @@ def register_socketio_events(socketio):
             
             room = f'order_{order_id}'
             leave_room(room)
+            chat_access.forget(request.sid, int(order_id))
             print(f"🚪 User {current_user.username} left room: {room}")
         except Exception as e:
             print(f"❌ Error in handle_leave: {str(e)}")
     
+    @socketio.on('history')
+    def handle_history(data):
+        """Send one page of older chat messages to the requesting client"""
+        if not current_user.is_authenticated:
+            return
+        
+        try:
+            order_id = int(data.get('order_id'))
+            if not order_id:
+                return
+            
+            messages, older_cursor = chat_manager.get_history(
+                order_id, current_user.id, before=data.get('before')
+            )
+            emit('history', {
+                'order_id': order_id,
+                'messages': [chat_manager.to_dict(message) for message in messages],
+                'older_cursor': older_cursor
+            })
+        except Exception as e:
+            print(f"❌ Error in handle_history: {str(e)}")
+            emit('error', {'message': 'Failed to load messages'})
+    
     @socketio.on('send_message')
     def handle_send_message(data):
         """Handle incoming chat message"""
@@ -79,32 +105,17 @@ def register_socketio_events(socketio):
                 return
             
             # Save message to database
-            message, error = chat_manager.send_message(order_id, current_user.id, content)
+            message, error = chat_manager.send_message(order_id, current_user.id, content,
+                                                       sid=request.sid)
             
             if error:
                 print(f"❌ Chat Manager Error: {error}")
                 emit('error', {'message': error})
                 return
             
-            # Convert to IST for display
-            ist_tz = pytz.timezone('Asia/Kolkata')
-            created_at = message.created_at
-            if created_at.tzinfo is None:
-                utc_tz = pytz.UTC
-                created_at = utc_tz.localize(created_at)
-            ist_time = created_at.astimezone(ist_tz)
-            
             # Broadcast to room (including self)
             room = f'order_{order_id}'
-            message_data = {
-                'id': message.id,
-                'sender_id': message.sender_id,
-                'sender_name': current_user.username,
-                'content': message.content,
-                'created_at': ist_time.isoformat(),
-                'time_display': ist_time.strftime('%I:%M %p')
-            }
-            emit('new_message', message_data, room=room)
+            emit('new_message', chat_manager.to_dict(message, current_user.username), room=room)
             print(f"💬 Message from {current_user.username} in {room}: {content[:30]}...")
         except Exception as e:
             print(f"❌ Error in handle_send_message: {str(e)}")
@@ -0,0 +1,467 @@
+"""
+Cross-Worker Invalidation Bus for SkillBridge
+
+Every gunicorn worker keeps its own manager singletons: search index,
+autocomplete trie, featured leaderboard and in-process caches. This bus
+broadcasts what one worker changed so the others can update too:
+- 'service_changes': IDs and changed field names of committed Service
+  changes (model_events); every other worker reloads those rows and
+  replays them to its local subscribers
+- 'cache': explicit cache invalidations (cache.on_invalidate)
+- 'order_access': orders whose chat grants were revoked (chat_access)
+
+Transports (INVALIDATION_BUS config):
+- 'postgres': LISTEN/NOTIFY on the application database
+- 'unix': UNIX datagram sockets in a directory shared by the workers of
+  one deployment (one socket per process; publishing sends to all)
+- 'auto' (default): postgres for PostgreSQL databases, else unix
+- 'none': disabled (single process)
+
+Messages are small JSON documents; long change lists are split to fit
+the transport's payload limit.
+
+If receiving fails (e.g. the database connection dropped), the bus
+reconnects with exponential backoff and then resynchronizes: messages
+sent meanwhile are lost, so every cache is invalidated and the search
+structures are rebuilt from the database (on_reconnect callbacks).
+A message that cannot be delivered on the sending side (too large, or
+the send failed) is replaced by a 'resync' message, which makes every
+other worker run the same resynchronization.
+
+Author: SkillBridge Team
+Purpose: Keep per-process caches coherent across workers
+"""
+
+import atexit
+import glob
+import hashlib
+import json
+import os
+import select
+import socket
+import tempfile
+import threading
+import uuid
+from extensions import socketio
+
+
+class UnixSocketTransport:
+    """
+    Broadcast over UNIX datagram sockets
+
+    Each process binds <directory>/<origin>.sock; publishing sends the
+    datagram to every other socket in the directory. Sockets of processes
+    that died are removed the first time a send to them is refused.
+    """
+
+    name = 'unix'
+
+    # Keep datagrams well under the default socket buffer size
+    max_payload = 60000
+
+    def __init__(self, directory, origin):
+        """
+        Args:
+            directory (str): Directory shared by all workers
+            origin (str): This process's bus ID
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.path = os.path.join(directory, f"{origin}.sock")
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._socket.bind(self.path)
+        self._sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sender.setblocking(False)
+        atexit.register(self.close)
+
+    def send(self, data):
+        """Send one message to every other process"""
+        for path in glob.glob(os.path.join(self.directory, '*.sock')):
+            if path == self.path:
+                continue
+            try:
+                self._sender.sendto(data, path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                # The process is gone; clean up its socket file
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+            except BlockingIOError:
+                print(f"⚠️  Invalidation bus: receiver {os.path.basename(path)} is full, message dropped")
+
+    def receive(self):
+        """Yield incoming messages (blocks)"""
+        while True:
+            yield self._socket.recv(65536)
+
+    def reconnect(self):
+        """Bind a fresh receiving socket"""
+        self.close()
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._socket.bind(self.path)
+
+    def close(self):
+        """Remove this process's socket"""
+        try:
+            self._socket.close()
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+
+class PostgresTransport:
+    """
+    Broadcast with PostgreSQL LISTEN/NOTIFY
+
+    Two dedicated connections are detached from the SQLAlchemy pool: one
+    LISTENs (and is polled by the receive loop), one sends pg_notify().
+    """
+
+    name = 'postgres'
+
+    CHANNEL = 'skillbridge_invalidation'
+
+    # NOTIFY payloads must be shorter than 8000 bytes
+    max_payload = 7500
+
+    def __init__(self, engine):
+        """
+        Args:
+            engine: SQLAlchemy engine (psycopg2 driver)
+        """
+        self._engine = engine
+        self._publish_lock = threading.Lock()
+        self._listener = None
+        self._publisher = None
+        self.reconnect()
+
+    @staticmethod
+    def _connect(engine):
+        """Take an autocommit DBAPI connection out of the pool"""
+        proxy = engine.raw_connection()
+        proxy.detach()
+        connection = proxy.driver_connection
+        connection.autocommit = True
+        return connection
+
+    @staticmethod
+    def _close(connection):
+        """Close a connection that may already be broken"""
+        if connection is None:
+            return
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def reconnect(self):
+        """Open fresh listening and publishing connections and LISTEN again"""
+        self._close(self._listener)
+        self._listener = None
+        listener = self._connect(self._engine)
+        listener.cursor().execute(f"LISTEN {self.CHANNEL}")
+        self._listener = listener
+        with self._publish_lock:
+            self._close(self._publisher)
+            self._publisher = None
+
+    def send(self, data):
+        """NOTIFY every listening process (the connection is reopened if it broke)"""
+        with self._publish_lock:
+            if self._publisher is None:
+                self._publisher = self._connect(self._engine)
+            try:
+                self._publisher.cursor().execute(
+                    "SELECT pg_notify(%s, %s)", (self.CHANNEL, data.decode())
+                )
+            except Exception:
+                self._close(self._publisher)
+                self._publisher = None
+                raise
+
+    def receive(self):
+        """Yield incoming notifications (blocks)"""
+        while True:
+            readable, _, _ = select.select([self._listener], [], [], 30)
+            if not readable:
+                continue
+            self._listener.poll()
+            while self._listener.notifies:
+                yield self._listener.notifies.pop(0).payload.encode()
+
+
+# Message kind asking the receivers to run their on_reconnect callbacks
+RESYNC = 'resync'
+
+
+class InvalidationBus:
+    """
+    Publish/subscribe hub between worker processes
+
+    OOP Concept: ADAPTER - one interface over interchangeable transports
+    """
+
+    # Seconds between reconnect attempts: doubled per failure up to the cap
+    RETRY_DELAY = 1
+    MAX_RETRY_DELAY = 60
+
+    def __init__(self):
+        self.origin = uuid.uuid4().hex[:16]
+        self._transport = None
+        self._app = None
+        self._handlers = {}   # message kind -> handler(payload)
+        self._reconnect_callbacks = []
+        self._resync_pending = False   # a message was lost; tell the others to resync
+        self.published = 0
+        self.received = 0
+        self.reconnects = 0
+
+    @property
+    def transport_name(self):
+        """Name of the active transport ('none' when disabled)"""
+        return self._transport.name if self._transport else 'none'
+
+    def register(self, kind, handler):
+        """
+        Handle messages of one kind from other processes
+
+        Args:
+            kind (str): Message kind
+            handler (callable): Called with the message payload
+        """
+        self._handlers[kind] = handler
+
+    def on_reconnect(self, callback):
+        """
+        Run a callback (inside an app context) after the bus reconnected,
+        to resynchronize state whose messages may have been lost
+
+        Args:
+            callback (callable): Called without arguments
+        """
+        self._reconnect_callbacks.append(callback)
+
+    def publish(self, kind, payload):
+        """
+        Send a message to every other process (no-op when disabled)
+
+        A message that cannot be sent is never just dropped: the other
+        processes are asked to resynchronize instead.
+
+        Args:
+            kind (str): Message kind
+            payload: JSON-serializable payload
+        """
+        if self._transport is None:
+            return
+        if self._resync_pending:
+            self._request_resync()
+        data = json.dumps({'o': self.origin, 'k': kind, 'p': payload},
+                          separators=(',', ':')).encode()
+        if len(data) > self._transport.max_payload:
+            if isinstance(payload, list) and len(payload) > 1:
+                middle = len(payload) // 2
+                self.publish(kind, payload[:middle])
+                self.publish(kind, payload[middle:])
+            else:
+                print(f"⚠️  Invalidation bus: {kind} message too large, asking workers to resync")
+                self._request_resync()
+            return
+        if not self._send(data):
+            self._resync_pending = True
+
+    def _send(self, data):
+        """
+        Hand one encoded message to the transport
+
+        Returns:
+            bool: False if the send failed
+        """
+        try:
+            self._transport.send(data)
+        except Exception as e:
+            print(f"⚠️  Invalidation bus publish failed: {e}")
+            return False
+        self.published += 1
+        return True
+
+    def _request_resync(self):
+        """Tell every other process to resynchronize (retried on the next publish)"""
+        data = json.dumps({'o': self.origin, 'k': RESYNC}, separators=(',', ':')).encode()
+        self._resync_pending = not self._send(data)
+
+    def _deliver(self, data):
+        """Dispatch one received message to its handler"""
+        try:
+            message = json.loads(data)
+        except ValueError:
+            return
+        if message.get('o') == self.origin:
+            return
+        if message.get('k') == RESYNC:
+            self.received += 1
+            self._resync()
+            return
+        handler = self._handlers.get(message.get('k'))
+        if handler is None:
+            return
+        self.received += 1
+        try:
+            handler(message.get('p'))
+        except Exception as e:
+            print(f"⚠️  Invalidation bus handler failed: {e}")
+
+    def _resync(self):
+        """Run the on_reconnect callbacks"""
+        from models import db
+
+        with self._app.app_context():
+            for callback in self._reconnect_callbacks:
+                try:
+                    callback()
+                except Exception as e:
+                    print(f"⚠️  Invalidation bus resync failed: {e}")
+            db.session.remove()
+
+    def _run(self):
+        """Background task: receive and dispatch messages, reconnecting on failure"""
+        delay = self.RETRY_DELAY
+        while True:
+            try:
+                for data in self._transport.receive():
+                    delay = self.RETRY_DELAY
+                    self._deliver(data)
+            except Exception as e:
+                print(f"⚠️  Invalidation bus receive failed, reconnecting in {delay} s: {e}")
+
+            socketio.sleep(delay)
+            delay = min(delay * 2, self.MAX_RETRY_DELAY)
+            try:
+                self._transport.reconnect()
+            except Exception as e:
+                print(f"⚠️  Invalidation bus reconnect failed: {e}")
+                continue
+            self.reconnects += 1
+            print(f"✓ Invalidation bus reconnected ({self._transport.name})")
+            self._resync()
+            if self._resync_pending:
+                self._request_resync()
+
+    def start(self, app, engine):
+        """
+        Open the configured transport and start receiving
+
+        Args:
+            app: Flask application
+            engine: SQLAlchemy engine
+        """
+        if self._transport is not None:
+            return
+
+        name = resolve_transport_name(app.config)
+        try:
+            if name == 'postgres':
+                self._transport = PostgresTransport(engine)
+            elif name == 'unix':
+                directory = app.config.get('INVALIDATION_BUS_DIR') or _default_directory(app)
+                self._transport = UnixSocketTransport(directory, self.origin)
+        except Exception as e:
+            print(f"⚠️  Invalidation bus ({name}) unavailable, caches are per worker: {e}")
+            self._transport = None
+
+        if self._transport is not None:
+            self._app = app
+            socketio.start_background_task(self._run)
+
+
+def resolve_transport_name(config):
+    """
+    Choose the transport from configuration
+
+    Args:
+        config (dict): Flask app config
+
+    Returns:
+        str: 'postgres', 'unix' or 'none'
+    """
+    name = (config.get('INVALIDATION_BUS') or 'auto').lower()
+    if name != 'auto':
+        return name
+    uri = (config.get('SQLALCHEMY_DATABASE_URI') or '').lower()
+    if uri.startswith(('postgresql', 'postgres')):
+        return 'postgres'
+    if hasattr(socket, 'AF_UNIX'):
+        return 'unix'
+    return 'none'
+
+
+def _default_directory(app):
+    """
+    Socket directory shared by workers of the same deployment
+
+    Derived from the instance path and database, and kept short because
+    UNIX socket paths are limited to about 100 characters.
+    """
+    key = f"{app.instance_path}|{app.config.get('SQLALCHEMY_DATABASE_URI')}"
+    digest = hashlib.sha1(key.encode()).hexdigest()[:12]
+    return os.path.join(tempfile.gettempdir(), f"skillbridge-bus-{digest}")
+
+
+# Singleton bus for this process
+invalidation_bus = InvalidationBus()
+
+# Set once model_events and the cache layer are connected to the bus
+_connected = False
+
+
+def init_invalidation_bus(app, engine):
+    """
+    Connect model_events and the cache layer to the bus and start it
+
+    Args:
+        app: Flask application
+        engine: SQLAlchemy engine
+    """
+    from cache import get_cache, on_invalidate, invalidate_all
+    from managers import search_engine
+    from models import db
+    from model_events import (forward_service_changes, apply_remote_service_changes,
+                              summarize_service_changes, load_service_changes)
+    from chat_access import chat_access, forward_revocations, apply_remote_revocations
+
+    def publish_service_changes(changes):
+        invalidation_bus.publish('service_changes', summarize_service_changes(changes))
+
+    def apply_service_changes(summaries):
+        # Runs on the bus task: reload the changed rows in an app context
+        with app.app_context():
+            try:
+                apply_remote_service_changes(load_service_changes(summaries))
+            finally:
+                db.session.remove()
+
+    def publish_revocations(order_ids):
+        invalidation_bus.publish('order_access', order_ids)
+
+    def publish_invalidation(namespace, key):
+        invalidation_bus.publish('cache', {'namespace': namespace, 'key': key})
+
+    def apply_invalidation(payload):
+        get_cache(payload['namespace']).invalidate(payload['key'], broadcast=False)
+
+    global _connected
+    if not _connected:
+        forward_service_changes(publish_service_changes)
+        on_invalidate(publish_invalidation)
+        forward_revocations(publish_revocations)
+        invalidation_bus.register('service_changes', apply_service_changes)
+        invalidation_bus.register('cache', apply_invalidation)
+        invalidation_bus.register('order_access', apply_remote_revocations)
+        # Messages missed while disconnected: start over from the database
+        invalidation_bus.on_reconnect(lambda: invalidate_all(broadcast=False))
+        invalidation_bus.on_reconnect(search_engine.rebuild_index)
+        invalidation_bus.on_reconnect(chat_access.revoke_all)
+        _connected = True
+
+    invalidation_bus.start(app, engine)
@@ -0,0 +1,172 @@
+"""
+Top-K Leaderboard for SkillBridge
+
+This module demonstrates:
+1. Data Structures: Sorted List (bisect), Dictionary
+2. Algorithms: Incremental top-K maintenance with a "floor" bound
+
+The leaderboard keeps the K best-rated active services in memory. Rating
+and activation changes are applied incrementally; the database is only
+read again when members drop out and fewer than the requested number
+remain.
+
+Author: SkillBridge Team
+Purpose: Serve the featured services list without scanning the catalog
+"""
+
+import threading
+from bisect import bisect_left, insort
+
+
+class Leaderboard:
+    """
+    Incrementally maintained top-K ranking of services
+
+    Ranking entries are TUPLES (-rating_avg, -rating_count, service_id),
+    so ascending order is best first and ties are deterministic.
+
+    Invariant: every active service outside the board ranks no better
+    than `_floor` (None means no service is outside the board), and
+    every member ranks better than `_floor`.
+
+    Time Complexity:
+    - update: O(K) (list insert/delete), K is small
+    - top: O(limit)
+    """
+
+    def __init__(self, capacity=20):
+        """
+        Args:
+            capacity (int): Number of services kept (K)
+        """
+        self.capacity = capacity
+        self._entries = {}   # service_id -> ranking entry
+        self._ranking = []   # SORTED LIST of ranking entries
+        self._floor = None
+        self._loaded = False
+        self._lock = threading.RLock()
+        # Held while reloading, so only one caller queries the database
+        self._reload_lock = threading.Lock()
+
+    @staticmethod
+    def _entry(service_id, rating_avg, rating_count):
+        """Build the sortable ranking entry"""
+        return (-(rating_avg or 0.0), -(rating_count or 0), service_id)
+
+    def load(self, loader):
+        """
+        (Re)load the board from the database
+
+        Args:
+            loader (callable): Takes K, returns the K best rows
+                               (id, rating_avg, rating_count), best first
+        """
+        with self._lock:
+            rows = loader(self.capacity)
+            self._entries = {row[0]: self._entry(*row) for row in rows}
+            self._ranking = sorted(self._entries.values())
+            # A full board means more services may exist below it
+            self._floor = self._ranking[-1] if len(rows) >= self.capacity else None
+            self._loaded = True
+
+    def _remove(self, service_id):
+        """Drop a member from the board"""
+        entry = self._entries.pop(service_id, None)
+        if entry is not None:
+            del self._ranking[bisect_left(self._ranking, entry)]
+
+    def update(self, service_id, rating_avg, rating_count, is_active=True):
+        """
+        Apply a service's new rating or activation state
+
+        Args:
+            service_id (int): Service ID
+            rating_avg (float): Current average rating
+            rating_count (int): Current review count
+            is_active (bool): Whether the service is listed
+        """
+        with self._lock:
+            if not self._loaded:
+                return
+
+            self._remove(service_id)
+            if not is_active:
+                return
+
+            entry = self._entry(service_id, rating_avg, rating_count)
+            if self._floor is not None and entry > self._floor:
+                # Ranks below something we cannot see; it stays outside
+                return
+
+            insort(self._ranking, entry)
+            self._entries[service_id] = entry
+
+            if len(self._ranking) > self.capacity:
+                evicted = self._ranking.pop()
+                del self._entries[evicted[2]]
+                self._floor = evicted if self._floor is None else min(self._floor, evicted)
+
+    def remove(self, service_id):
+        """
+        Remove a deleted or deactivated service
+
+        Args:
+            service_id (int): Service ID
+        """
+        with self._lock:
+            self._remove(service_id)
+
+    def reset(self):
+        """Forget the ranking; the next ensure_loaded() reloads it"""
+        with self._lock:
+            self._loaded = False
+
+    def needs_reload(self, limit):
+        """
+        Check if the board cannot answer a request for `limit` services
+
+        Args:
+            limit (int): Number of services requested
+
+        Returns:
+            bool: True if load() must run first
+        """
+        with self._lock:
+            if not self._loaded:
+                return True
+            return len(self._ranking) < limit and self._floor is not None
+
+    def ensure_loaded(self, limit, loader):
+        """
+        Reload if needed, with stampede protection
+
+        Only one caller reloads. Concurrent callers keep reading the
+        current (shorter) board instead of waiting, unless nothing has
+        been loaded yet.
+
+        Args:
+            limit (int): Number of services requested
+            loader (callable): See load()
+        """
+        if not self.needs_reload(limit):
+            return
+        if self._reload_lock.acquire(blocking=not self._loaded):
+            try:
+                # Another caller may have reloaded while we waited
+                if self.needs_reload(limit):
+                    self.load(loader)
+            finally:
+                self._reload_lock.release()
+
+    def top(self, limit):
+        """
+        Get the best service IDs
+
+        Args:
+            limit (int): Number of services
+
+        Returns:
+            list: Service IDs, best first
+        """
+        with self._lock:
+            return [entry[2] for entry in self._ranking[:limit]]
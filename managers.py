@@ -12,11 +12,80 @@ Author: SkillBridge Team
 Purpose: Centralized business logic with data structure demonstrations
 """
 
+import base64
 import heapq
+import json
 import random
+import uuid
 from collections import defaultdict, deque
 from datetime import datetime, timedelta
-from models import db, Service, User, Category, Review, Order, Favorite, Notification, Message
+import pytz
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+from extensions import socketio
+from models import (db, Service, User, Category, Review, Order, Favorite, Notification, Message,
+                    Community, CommunityMember)
+from model_events import on_service_change, notify_service_changes, SERVICE_FIELDS
+from search_index import InvertedIndex, AutocompleteIndex
+from search_backends import MemorySearchBackend, create_search_backend
+from leaderboard import Leaderboard
+from cache import get_cache
+from site_counters import get_counters, add_reconcile_job
+from chat_access import chat_access
+from chat_writer import chat_writer
+
+
+def encode_cursor(values):
+    """
+    Encode sort-key values as an opaque URL-safe cursor (keyset pagination)
+    
+    Args:
+        values (list): Sort-key values of the last row shown
+        
+    Returns:
+        str: Cursor
+    """
+    values = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def decode_cursor(cursor, types):
+    """
+    Decode a cursor from encode_cursor, checking every value's type
+    
+    Cursors come from clients (query strings, Socket.IO events), so a
+    value of the wrong type, which would otherwise reach the SQL
+    comparison, invalidates the cursor.
+    
+    Args:
+        cursor (str): Cursor from a previous page
+        types (list): Expected Python type per value (int, float or datetime)
+        
+    Returns:
+        list: Sort-key values (datetimes parsed), or None if the cursor
+        is missing or does not match
+    """
+    if not cursor or not isinstance(cursor, str):
+        return None
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(values, list) or len(values) != len(types):
+        return None
+    
+    decoded = []
+    for value, expected in zip(values, types):
+        if expected is datetime:
+            try:
+                value = datetime.fromisoformat(value)
+            except (TypeError, ValueError):
+                return None
+        elif isinstance(value, bool) or not isinstance(
+                value, (int, float) if expected is float else expected):
+            return None
+        decoded.append(value)
+    return decoded
 
 
 class ServiceManager:
@@ -32,27 +101,96 @@ class ServiceManager:
     - DICTIONARY (HashMap): For caching - O(1) lookup time
     - HEAP: For efficient top-N selection
     - SET: For unique tag management
+    - INVERTED INDEX: For text search (see search_index.py)
+    - SORTED LIST: Top-K featured leaderboard (see leaderboard.py)
+    
+    Design Pattern: STRATEGY - full-text search is delegated to a backend
+    chosen from the database URI (see search_backends.py)
     """
     
     def __init__(self):
         """
-        Initialize ServiceManager with cache
+        Initialize ServiceManager with cache and search index
         
-        Data Structure: DICTIONARY for caching
+        Data Structure: shared LRU/TTL cache namespace (see cache.py)
         - Key: cache identifier (string)
         - Value: cached data
         - Benefit: O(1) lookup time for frequently accessed data
         """
-        self._cache = {}  # Private attribute (encapsulation)
-        self._cache_timeout = 300  # Cache timeout in seconds (5 minutes)
+        self._cache = get_cache('services', ttl=300, stale_ttl=60)  # Private attribute (encapsulation)
+        on_service_change(self._invalidate_on_service_change)
+        
+        # Inverted index, built lazily and updated after every commit
+        self._search_index = InvertedIndex()
+        on_service_change(self._search_index.apply_changes)
+        
+        # Top-K featured services, updated on review and activation changes
+        self._featured = Leaderboard(capacity=20)
+        on_service_change(self._apply_featured_changes)
+        
+        # Full-text backend (replaced by configure_search_backend at startup)
+        self._memory_backend = MemorySearchBackend(self._get_search_index)
+        self.search_backend = self._memory_backend
+    
+    def configure_search_backend(self, app):
+        """
+        Select the full-text backend for the app's database
+        
+        PostgreSQL -> tsvector + GIN, SQLite -> FTS5, otherwise in-memory.
+        Must be called inside an application context.
+        
+        Args:
+            app: Flask application
+        """
+        self.search_backend = create_search_backend(app, db.engine, self._memory_backend)
+    
+    def _get_search_index(self):
+        """
+        Get the search index, building it from the database on first use
+        
+        Returns:
+            InvertedIndex: Index of all active services
+        """
+        self._search_index.ensure_built(
+            lambda: db.session.query(
+                Service.id, Service.title, Service.tags, Service.description
+            ).filter(Service.is_active == True).all()
+        )
+        return self._search_index
+    
+    def reload_search_structures(self):
+        """
+        Rebuild the inverted index and the featured leaderboard from the
+        database (after changes from other workers may have been missed)
+        """
+        self._search_index.reset()
+        self._featured.reset()
+        self._get_search_index()
+    
+    def _query_top_rated(self, limit):
+        """
+        Query the best-rated active services (rating, then review count)
+        
+        Args:
+            limit (int): Number of rows
+            
+        Returns:
+            list: Rows of (id, rating_avg, rating_count)
+        """
+        return db.session.query(Service.id, Service.rating_avg, Service.rating_count)\
+            .filter(Service.is_active == True)\
+            .order_by(Service.rating_avg.desc(), Service.rating_count.desc(), Service.id)\
+            .limit(limit).all()
     
     def get_featured_services(self, limit=4):
         """
-        Get top-rated featured services using HEAP data structure
+        Get top-rated featured services
         
-        Data Structure: HEAP (Priority Queue)
-        Algorithm: heapq.nlargest() for efficient top-N selection
-        Time Complexity: O(n log k) where k = limit
+        Data Structure: In-memory top-K LEADERBOARD
+        Algorithm: Read the ranking from memory, then load just those rows
+        by primary key. The leaderboard is reloaded only when too few
+        members remain after deactivations or rating drops.
+        Time Complexity: O(limit), independent of catalog size
         
         Args:
             limit (int): Number of services to return
@@ -60,32 +198,74 @@ class ServiceManager:
         Returns:
             list: Top-rated Service objects
         """
-        # Get all active services
-        services = Service.query.filter_by(is_active=True).all()
+        if limit > self._featured.capacity:
+            ids = [row.id for row in self._query_top_rated(limit)]
+        else:
+            self._featured.ensure_loaded(limit, self._query_top_rated)
+            ids = self._featured.top(limit)
         
-        # Use heap to get top N services by rating
-        # heapq.nlargest is more efficient than sorting entire list
-        featured = heapq.nlargest(
-            limit,
-            services,
-            key=lambda s: (s.get_average_rating(), s.get_review_count())
-        )
+        if not ids:
+            return []
+        
+        services = {s.id: s for s in Service.query.filter(Service.id.in_(ids)).all()}
+        return [services[service_id] for service_id in ids if service_id in services]
+    
+    def refresh_featured(self, service_id):
+        """
+        Re-rank one service after its rating changed
+        
+        Rating aggregates are written with a bulk UPDATE, which emits no
+        ORM events, so the change is announced here (to this process's
+        leaderboard and, through the invalidation bus, to other workers)
         
-        return featured
+        Args:
+            service_id (int): Service ID
+        """
+        columns = [getattr(Service, field) for field in SERVICE_FIELDS]
+        row = db.session.query(*columns).filter(Service.id == service_id).first()
+        if row is None:
+            change = {'id': service_id, 'deleted': True, 'changed': set(SERVICE_FIELDS)}
+            change.update({field: None for field in SERVICE_FIELDS})
+        else:
+            change = {'id': service_id, 'deleted': False, 'changed': {'rating_avg', 'rating_count'}}
+            change.update(zip(SERVICE_FIELDS, row))
+        notify_service_changes([change])
     
-    def search_services(self, query, filters=None):
+    def _apply_featured_changes(self, changes):
+        """
+        Apply committed activation changes to the leaderboard
+        (model_events subscriber)
+        
+        Args:
+            changes (list): Change dictionaries from model_events
+        """
+        for change in changes:
+            if change['deleted']:
+                self._featured.remove(change['id'])
+            elif change['changed'] & {'is_active', 'rating_avg', 'rating_count'}:
+                self._featured.update(change['id'], change['rating_avg'],
+                                      change['rating_count'], change['is_active'])
+    
+    def search_services(self, query, filters=None, ranking='default'):
         """
         Search services with advanced filtering
         
         Algorithm:
-        1. Tokenize search query
-        2. Search in title, description, and tags
-        3. Apply filters (category, price range, etc.)
-        4. Rank results by relevance
+        1. Apply filters (category, price range, etc.) to the base query
+        2. Match and rank the query text with the search backend:
+           - 'default': the configured backend (PostgreSQL tsvector,
+             SQLite FTS5 or the in-memory INVERTED INDEX); all query
+             words required
+           - 'bm25': the in-memory index's BM25F score from precomputed
+             document statistics; any query word matches
+        
+        Time Complexity: proportional to the matching postings (or index
+        entries), independent of the catalog size
         
         Args:
             query (str): Search query
             filters (dict): Optional filters (category_id, min_price, max_price, etc.)
+            ranking (str): Ranking mode ('default' or 'bm25')
             
         Returns:
             list: Matching Service objects sorted by relevance
@@ -93,19 +273,50 @@ class ServiceManager:
         if not query and not filters:
             return []
         
-        # Start with all active services
-        results = Service.query.filter_by(is_active=True)
+        results = self._filtered_query(filters)
         
-        # Apply text search if query provided
+        # Apply text search if query provided (ranked by the backend)
         if query:
-            search_term = f'%{query.lower()}%'
-            results = results.filter(
-                db.or_(
-                    Service.title.ilike(search_term),
-                    Service.description.ilike(search_term),
-                    Service.tags.ilike(search_term)
-                )
-            )
+            backend = self._memory_backend if ranking == 'bm25' else self.search_backend
+            matches = backend.search(results, query, ranking)
+            if matches:
+                return matches
+            # Words match whole tokens or prefixes only; keep the original
+            # substring behaviour for mid-word text ("ango" -> Django) and
+            # for queries without any searchable word
+            return results.filter(self._substring_match(query)).all()
+        
+        return results.all()
+    
+    @staticmethod
+    def _substring_match(query):
+        """
+        Case-insensitive substring predicate on title, description and tags
+        
+        Args:
+            query (str): Search text
+            
+        Returns:
+            ColumnElement: SQL condition
+        """
+        return db.or_(
+            Service.title.icontains(query, autoescape=True),
+            Service.description.icontains(query, autoescape=True),
+            Service.tags.icontains(query, autoescape=True),
+        )
+    
+    def _filtered_query(self, filters=None):
+        """
+        Build the active-services query with browse filters applied
+        
+        Args:
+            filters (dict): Optional filters (category_id, min_price, max_price)
+            
+        Returns:
+            Query: Service query
+        """
+        # Start with all active services
+        results = Service.query.filter_by(is_active=True)
         
         # Apply filters if provided
         if filters:
@@ -118,35 +329,113 @@ class ServiceManager:
             if 'max_price' in filters and filters['max_price']:
                 results = results.filter(Service.price <= filters['max_price'])
         
-        # Get all results
-        services = results.all()
+        return results
+    
+    # Browse sort orders: (key columns, descending?)
+    # Every key ends with Service.id so the order is total and a cursor
+    # identifies exactly one position
+    BROWSE_SORTS = {
+        'price_asc': ((Service.price, Service.id), False),
+        'price_desc': ((Service.price, Service.id), True),
+        'rating': ((Service.rating_avg, Service.rating_count, Service.id), True),
+        'newest': ((Service.created_at, Service.id), True),
+    }
+    
+    def _browse_by_relevance(self, results, scores, cursor, per_page):
+        """
+        Get one page of services in BM25 order
+        
+        The ranking is sorted in memory and the cursor is a position in
+        it. Rows are loaded one page-sized slice of ranked IDs at a time
+        (filters applied in SQL), so a page loads about per_page rows
+        instead of every match.
         
-        # Rank by relevance (simple scoring algorithm)
-        if query:
-            scored_services = []
-            query_lower = query.lower()
-            
-            for service in services:
-                score = 0
-                # Title match gets highest score
-                if query_lower in service.title.lower():
-                    score += 10
-                # Tag match gets medium score
-                if service.tags and query_lower in service.tags.lower():
-                    score += 5
-                # Description match gets lower score
-                if query_lower in service.description.lower():
-                    score += 2
-                # Boost by rating
-                score += service.get_average_rating()
-                
-                scored_services.append((score, service))
+        Args:
+            results: Service query with filters applied
+            scores (dict): service_id -> BM25 score
+            cursor (str): Cursor from the previous page
+            per_page (int): Page size
+            
+        Returns:
+            tuple: (list of Service objects, next page cursor or None)
+        """
+        ranked = sorted(scores, key=lambda service_id: (-scores[service_id], service_id))
+        position = decode_cursor(cursor, [int])
+        start = position[0] if position and 0 <= position[0] <= len(ranked) else 0
+        
+        page = []
+        for offset in range(start, len(ranked), per_page + 1):
+            chunk = ranked[offset:offset + per_page + 1]
+            found = {s.id: s for s in results.filter(Service.id.in_(chunk)).all()}
+            for index, service_id in enumerate(chunk, offset):
+                if service_id not in found:
+                    continue
+                if len(page) == per_page:
+                    return page, encode_cursor([index])
+                page.append(found[service_id])
+        return page, None
+    
+    def browse_services(self, query='', filters=None, sort_by='rating', cursor=None, per_page=12):
+        """
+        Get one page of services for the browse page
+        
+        Algorithm: KEYSET (cursor) PAGINATION
+        - Filtering and ordering run in SQL, served by the composite
+          (is_active, sort key..., id) indexes on services
+        - The cursor holds the sort key of the last row shown; the next
+          page is `WHERE (key..., id) > cursor ORDER BY key..., id LIMIT n`,
+          so deep pages cost the same as the first (no OFFSET scan)
+        - Search text is matched by the backend's SQL predicate; with no
+          match at all, the substring match of search_services is used
+        - 'relevance' is the exception: BM25 scores only exist in the
+          in-memory index, so that order is paged by position (see
+          _browse_by_relevance)
+        
+        Args:
+            query (str): Search text (optional)
+            filters (dict): Optional filters (category_id, min_price, max_price)
+            sort_by (str): price_asc, price_desc, rating, newest or relevance
+            cursor (str): Cursor from the previous page (None for the first)
+            per_page (int): Page size
             
-            # Sort by score (highest first)
-            scored_services.sort(reverse=True, key=lambda x: x[0])
-            return [service for score, service in scored_services]
+        Returns:
+            tuple: (list of Service objects, next page cursor or None)
+        """
+        results = self._filtered_query(filters)
         
-        return services
+        if query and sort_by == 'relevance':
+            scores = self._get_search_index().search_bm25(query)
+            if scores:
+                return self._browse_by_relevance(results, scores, cursor, per_page)
+        
+        if query:
+            # Text match as a SQL predicate of the same query, so ordering,
+            # the keyset condition and LIMIT all run in the database
+            matched = self.search_backend.match(results, query)
+            if matched is not None and matched.with_entities(Service.id).limit(1).first():
+                results = matched
+            else:
+                results = results.filter(self._substring_match(query))
+        
+        columns, descending = self.BROWSE_SORTS.get(sort_by, self.BROWSE_SORTS['rating'])
+        
+        after = decode_cursor(cursor, [column.type.python_type for column in columns])
+        if after is not None:
+            key = db.tuple_(*columns)
+            results = results.filter(key < db.tuple_(*after) if descending
+                                     else key > db.tuple_(*after))
+        
+        ordering = [column.desc() if descending else column.asc() for column in columns]
+        
+        # One extra row tells whether another page exists
+        rows = results.order_by(*ordering).limit(per_page + 1).all()
+        page = rows[:per_page]
+        
+        next_cursor = None
+        if len(rows) > per_page:
+            last = page[-1]
+            next_cursor = encode_cursor([getattr(last, column.key) for column in columns])
+        return page, next_cursor
     
     def get_recommendations(self, user, limit=6):
         """
@@ -184,19 +473,12 @@ class ServiceManager:
             if order.service.category_id:
                 favorite_categories.add(order.service.category_id)
         
-        # Get services from favorite categories
+        # Get top-rated services from favorite categories
         if favorite_categories:
-            recommendations = Service.query.filter(
+            return Service.query.filter(
                 Service.category_id.in_(favorite_categories),
                 Service.is_active == True
-            ).limit(limit * 2).all()
-            
-            # Sort by rating and return top N
-            recommendations.sort(
-                key=lambda s: s.get_average_rating(),
-                reverse=True
-            )
-            return recommendations[:limit]
+            ).order_by(Service.rating_avg.desc()).limit(limit).all()
         
         # Fallback to featured services
         return self.get_featured_services(limit)
@@ -210,18 +492,35 @@ class ServiceManager:
         Returns:
             list: Sorted list of unique tags
         """
+        return list(self._cache.get_or_set('tags', self._collect_tags))
+    
+    def _collect_tags(self):
+        """Scan active services for tags (cached by get_all_tags)"""
         # Use SET to store unique tags
         all_tags = set()
         
-        services = Service.query.filter_by(is_active=True).all()
-        for service in services:
-            if service.tags:
-                tags = service.get_tags_list()
-                all_tags.update(tags)
+        rows = db.session.query(Service.tags)\
+            .filter(Service.is_active == True, Service.tags.isnot(None)).all()
+        for (tags,) in rows:
+            all_tags.update(tag.strip() for tag in tags.split(','))
+        all_tags.discard('')
         
         # Return sorted list
         return sorted(all_tags)
     
+    def _invalidate_on_service_change(self, changes):
+        """
+        Invalidate cached service data (model_events subscriber)
+        
+        Args:
+            changes (list): Change dictionaries from model_events
+        """
+        for change in changes:
+            if change['deleted'] or change['changed'] & {'tags', 'is_active'}:
+                # Every worker runs this subscriber, no need to broadcast
+                self._cache.invalidate('tags', broadcast=False)
+                return
+    
     def filter_by_category(self, category_id):
         """
         Get all services in a category
@@ -277,8 +576,7 @@ class ServiceManager:
         db.session.add(service)
         db.session.commit()
         
-        # Clear cache
-        self._cache.clear()
+        # Cached data is invalidated by _invalidate_on_service_change
         
         return service
 
@@ -380,25 +678,51 @@ class SearchEngine:
     Advanced Search Engine with Autocomplete
     
     Data Structures:
-    - TRIE: For efficient autocomplete
+    - TRIE: For efficient autocomplete (see search_index.py)
     - INVERTED INDEX: For fast text search
-    - DICTIONARY: For caching
     """
     
     def __init__(self):
         """
         Initialize search engine with data structures
         """
-        self.suggestions_cache = {}  # Dictionary for caching
+        # Trie of titles and tags, updated after every committed change
+        self._autocomplete = AutocompleteIndex()
+        on_service_change(self._autocomplete.apply_changes)
+    
+    def build_index(self):
+        """
+        Load the autocomplete trie from the database (once per process)
+        
+        Called at startup; also called lazily in case startup skipped it.
+        """
+        self._autocomplete.ensure_built(
+            lambda: db.session.query(Service.id, Service.title, Service.tags)
+                              .filter(Service.is_active == True).all()
+        )
+    
+    def rebuild_index(self):
+        """
+        Reload the autocomplete trie and the service search structures
+        
+        Used when changes committed by other workers may have been missed
+        (the invalidation bus reconnected).
+        """
+        self._autocomplete.reset()
+        service_manager.reload_search_structures()
+        self.build_index()
     
     def get_autocomplete_suggestions(self, query, limit=5):
         """
         Get autocomplete suggestions for search query
         
         Algorithm:
-        1. Check cache
-        2. Search in service titles and tags
-        3. Return top matches
+        1. Normalize query to a trie key
+        2. Walk the TRIE to the prefix node
+        3. Depth-first search for the first matches
+        
+        Time Complexity: O(p + n) for prefix length p and n visited nodes,
+        no database access
         
         Args:
             query (str): Partial search query
@@ -410,39 +734,8 @@ class SearchEngine:
         if not query or len(query) < 2:
             return []
         
-        # Check cache
-        cache_key = query.lower()
-        if cache_key in self.suggestions_cache:
-            return self.suggestions_cache[cache_key]
-        
-        # Search in titles and tags
-        suggestions = set()  # Use SET to avoid duplicates
-        
-        search_term = f'%{query.lower()}%'
-        services = Service.query.filter(
-            Service.is_active == True,
-            db.or_(
-                Service.title.ilike(search_term),
-                Service.tags.ilike(search_term)
-            )
-        ).limit(limit * 2).all()
-        
-        # Extract suggestions from titles
-        for service in services:
-            suggestions.add(service.title)
-            # Add tags
-            if service.tags:
-                for tag in service.get_tags_list():
-                    if query.lower() in tag.lower():
-                        suggestions.add(tag)
-        
-        # Convert to sorted list
-        result = sorted(suggestions)[:limit]
-        
-        # Cache the result
-        self.suggestions_cache[cache_key] = result
-        
-        return result
+        self.build_index()
+        return self._autocomplete.suggest(query, limit)
     
     def search_by_tags(self, tags):
         """
@@ -457,20 +750,10 @@ class SearchEngine:
         if not tags:
             return []
         
-        # Find services that match any of the tags
-        services = []
-        for tag in tags:
-            search_term = f'%{tag}%'
-            matching = Service.query.filter(
-                Service.is_active == True,
-                Service.tags.ilike(search_term)
-            ).all()
-            services.extend(matching)
-        
-        # Remove duplicates using SET
-        unique_services = list(set(services))
-        
-        return unique_services
+        # One indexed query through the configured full-text backend
+        return service_manager.search_backend.search_tags(
+            Service.query.filter_by(is_active=True), tags
+        )
 
 
 class ReviewSystem:
@@ -480,6 +763,10 @@ class ReviewSystem:
     OOP Concepts:
     - VALIDATION: Review validation
     - BUSINESS LOGIC: Rating calculations
+    
+    DBMS Concepts:
+    - TRANSACTION: the review row and the service's denormalized rating
+      columns are written in the same commit
     """
     
     def add_review(self, service_id, user_id, rating, comment):
@@ -517,8 +804,20 @@ class ReviewSystem:
         )
         
         db.session.add(review)
+        
+        # Update rating aggregates atomically in the same transaction
+        # (SET expressions read the pre-update values)
+        Service.query.filter_by(id=service_id).update({
+            Service.rating_sum: Service.rating_sum + rating,
+            Service.rating_count: Service.rating_count + 1,
+            Service.rating_avg: (Service.rating_sum + rating) * 1.0 / (Service.rating_count + 1)
+        }, synchronize_session=False)
+        
         db.session.commit()
         
+        # Re-rank the service on the featured leaderboard
+        service_manager.refresh_featured(service_id)
+        
         return review, None
     
     def get_service_reviews(self, service_id, limit=None):
@@ -544,18 +843,43 @@ class ReviewSystem:
         """
         Calculate rating distribution for a service
         
+        Algorithm: one GROUP BY rating aggregate - at most five rows come
+        back, however many reviews the service has
+        
         Returns:
             dict: Rating distribution (1-5 stars with counts)
         """
-        reviews = Review.query.filter_by(service_id=service_id).all()
-        
-        # Initialize distribution dictionary
-        distribution = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
+        return self.calculate_rating_distributions([service_id])[service_id]
+    
+    def calculate_rating_distributions(self, service_ids):
+        """
+        Calculate rating distributions for many services in one query
         
-        for review in reviews:
-            distribution[review.rating] += 1
+        Algorithm: GROUP BY (service_id, rating), then fold the rows into
+        a DICTIONARY per service
         
-        return distribution
+        Args:
+            service_ids (list): Service IDs
+            
+        Returns:
+            dict: service_id -> rating distribution (1-5 stars with counts)
+        """
+        # Initialize distribution dictionaries
+        distributions = {service_id: {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
+                         for service_id in service_ids}
+        if not distributions:
+            return distributions
+        
+        rows = db.session.query(Review.service_id, Review.rating, db.func.count(Review.id))\
+            .filter(Review.service_id.in_(list(distributions)))\
+            .group_by(Review.service_id, Review.rating)\
+            .all()
+        
+        for service_id, rating, count in rows:
+            if rating in distributions[service_id]:
+                distributions[service_id][rating] = count
+        
+        return distributions
 
 
 class OrderManager:
@@ -686,8 +1010,16 @@ class CategoryManager:
     OOP Concepts:
     - CRUD operations for categories
     - Dynamic category management
+    
+    Data Structures Used:
+    - Shared cache namespace for category stats, invalidated on service changes
     """
     
+    def __init__(self):
+        """Initialize the stats cache"""
+        self._cache = get_cache('categories', ttl=600, stale_ttl=120)
+        on_service_change(self._invalidate_on_service_change)
+    
     def get_all_categories(self):
         """
         Get all categories with service counts
@@ -724,6 +1056,7 @@ class CategoryManager:
         
         db.session.add(category)
         db.session.commit()
+        self.invalidate_stats()
         
         return category
     
@@ -731,22 +1064,219 @@ class CategoryManager:
         """
         Get statistics for all categories
         
+        Algorithm: categories LEFT JOIN active services GROUP BY category -
+        one query, cached until a service is created, moved, activated,
+        deactivated or deleted
+        
         Returns:
             list: Category stats with service counts
         """
-        categories = self.get_all_categories()
-        stats = []
+        return list(self._cache.get_or_set('stats', self._query_category_stats))
+    
+    def _query_category_stats(self):
+        """Run the grouped stats query (cached by get_category_stats)"""
+        rows = db.session.query(Category, db.func.count(Service.id))\
+            .outerjoin(Service, db.and_(Service.category_id == Category.id,
+                                        Service.is_active == True))\
+            .group_by(Category.id)\
+            .order_by(Category.id)\
+            .all()
         
-        for category in categories:
+        stats = []
+        for category, service_count in rows:
             stats.append({
                 'id': category.id,
                 'name': category.name,
-                'service_count': category.get_service_count(),
+                'description': category.description,
+                'service_count': service_count,
                 'icon': category.icon,
                 'color': category.color
             })
         
         return stats
+    
+    def invalidate_stats(self):
+        """Drop the cached category stats"""
+        self._cache.invalidate('stats')
+    
+    def _invalidate_on_service_change(self, changes):
+        """
+        Invalidate stats when service counts may have changed
+        (model_events subscriber)
+        
+        Args:
+            changes (list): Change dictionaries from model_events
+        """
+        for change in changes:
+            if change['deleted'] or change['changed'] & {'is_active', 'category_id'}:
+                # Every worker runs this subscriber, no need to broadcast
+                self._cache.invalidate('stats', broadcast=False)
+                return
+
+
+class StatsManager:
+    """
+    Site-wide statistics for the home and about pages
+    
+    Totals come from the materialized site_counters table (see
+    site_counters.py), cached briefly with stale-while-revalidate
+    """
+    
+    def __init__(self):
+        """Initialize the stats cache"""
+        self._cache = get_cache('site_stats', ttl=60, stale_ttl=300)
+    
+    def _counters(self):
+        """Get the site counters (one small query, cached)"""
+        return self._cache.get_or_set('counters', get_counters)
+    
+    def get_homepage_stats(self):
+        """
+        Get totals shown on the home page
+        
+        Returns:
+            dict: total_users, total_services, total_reviews
+        """
+        counters = self._counters()
+        return {
+            'total_users': counters['users'],
+            'total_services': counters['active_services'],
+            'total_reviews': counters['reviews']
+        }
+    
+    def get_about_stats(self):
+        """
+        Get totals shown on the about page
+        
+        Returns:
+            dict: total_users, total_services, total_reviews (approved
+                  website feedback) and average_rating
+        """
+        counters = self._counters()
+        website_reviews = counters['website_reviews']
+        average_rating = round(counters['website_rating_sum'] / website_reviews, 1) \
+            if website_reviews else 0.0
+        return {
+            'total_users': counters['users'],
+            'total_services': counters['active_services'],
+            'total_reviews': website_reviews,
+            'average_rating': average_rating
+        }
+
+
+class CommunityManager:
+    """
+    Community membership management
+    
+    DBMS Concepts:
+    - INSERT ... ON CONFLICT DO NOTHING against the unique
+      (user_id, community_id) index: concurrent duplicate joins insert
+      one row, and only the request that inserted it bumps the count
+    - members_count is changed with `members_count +/- 1` in the same
+      transaction as the membership row
+    """
+    
+    def _insert_membership(self, user_id, community_id):
+        """
+        Insert a membership unless it exists
+        
+        Returns:
+            bool: True if a row was inserted
+        """
+        values = {'user_id': user_id, 'community_id': community_id,
+                  'role': 'member', 'joined_at': datetime.utcnow()}
+        dialect = db.session.get_bind().dialect.name
+        
+        if dialect in ('postgresql', 'sqlite'):
+            if dialect == 'postgresql':
+                from sqlalchemy.dialects.postgresql import insert
+            else:
+                from sqlalchemy.dialects.sqlite import insert
+            statement = insert(CommunityMember).values(**values)\
+                .on_conflict_do_nothing(index_elements=['user_id', 'community_id'])
+            return db.session.execute(statement).rowcount == 1
+        
+        # Other databases: rely on the unique constraint
+        try:
+            with db.session.begin_nested():
+                db.session.execute(db.insert(CommunityMember).values(**values))
+            return True
+        except IntegrityError:
+            return False
+    
+    def _adjust_members_count(self, community_id, delta):
+        """Atomically add delta to a community's members_count"""
+        db.session.execute(
+            db.update(Community)
+              .where(Community.id == community_id)
+              .values(members_count=Community.members_count + delta),
+            execution_options={'synchronize_session': False}
+        )
+    
+    def join(self, community_id, user_id):
+        """
+        Add a user to a community
+        
+        Args:
+            community_id (int): Community ID
+            user_id (int): User ID
+            
+        Returns:
+            bool: True if joined, False if already a member
+        """
+        try:
+            joined = self._insert_membership(user_id, community_id)
+            if joined:
+                self._adjust_members_count(community_id, 1)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return joined
+    
+    def leave(self, community_id, user_id):
+        """
+        Remove a user from a community
+        
+        Args:
+            community_id (int): Community ID
+            user_id (int): User ID
+            
+        Returns:
+            bool: True if left, False if not a member
+        """
+        try:
+            result = db.session.execute(
+                db.delete(CommunityMember).where(
+                    CommunityMember.user_id == user_id,
+                    CommunityMember.community_id == community_id
+                ),
+                execution_options={'synchronize_session': False}
+            )
+            left = result.rowcount == 1
+            if left:
+                self._adjust_members_count(community_id, -1)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return left
+    
+    def get_joined_ids(self, user_id):
+        """
+        Get IDs of the communities a user belongs to (one query)
+        
+        Data Structure: SET for O(1) membership checks in listings
+        
+        Args:
+            user_id (int): User ID
+            
+        Returns:
+            set: Community IDs
+        """
+        rows = db.session.query(CommunityMember.community_id)\
+            .filter(CommunityMember.user_id == user_id).all()
+        return {community_id for (community_id,) in rows}
 
 
 class NotificationManager:
@@ -754,10 +1284,193 @@ class NotificationManager:
     Notification Management System
     
     Handles creation and retrieval of user notifications
+    
+    Real-time delivery: every change is pushed over Socket.IO to the
+    user's room (user_<id>, joined on connect, see events.py):
+    - 'notification': a new notification plus the unread count
+    - 'unread_count': the unread count after reads/deletes
+    
+    Unread counts: users.unread_notifications is adjusted in the same
+    transaction as each write, by the number of rows the write actually
+    changed; reconcile_unread_counts() corrects any drift
+    
+    Retention: prune_read_notifications() deletes read notifications
+    older than NOTIFICATION_RETENTION_DAYS in small batches, one short
+    transaction each, on the periodic reconcile schedule
     """
     
+    def __init__(self):
+        """Register the unread counter reconcile and retention with the periodic jobs"""
+        self.retention_metrics = {
+            'runs': 0,
+            'rows_pruned': 0,
+            'last_run_at': None,
+            'last_run_pruned': 0,
+            'last_run_batches': 0,
+            'last_run_seconds': 0.0,
+        }
+        add_reconcile_job(self.reconcile_unread_counts)
+        add_reconcile_job(self.run_retention)
+    
+    @staticmethod
+    def room_for(user_id):
+        """Socket.IO room that receives a user's notifications"""
+        return f'user_{user_id}'
+    
+    @staticmethod
+    def to_dict(notification):
+        """
+        Serialize a notification for clients (time shown in IST)
+        
+        Returns:
+            dict: Notification data
+        """
+        created_at = notification.created_at
+        if created_at.tzinfo is None:
+            created_at = pytz.UTC.localize(created_at)
+        ist_time = created_at.astimezone(pytz.timezone('Asia/Kolkata'))
+        
+        return {
+            'id': notification.id,
+            'title': notification.title,
+            'message': notification.message,
+            'link': notification.link or '#',
+            'is_read': notification.is_read,
+            'time': ist_time.strftime('%I:%M %p')
+        }
+    
+    def _push(self, user_id, event, data):
+        """Emit an event to the user's room (delivery is best effort)"""
+        try:
+            socketio.emit(event, data, to=self.room_for(user_id))
+        except Exception as e:
+            print(f"⚠️  Notification push failed for user {user_id}: {e}")
+    
+    def _push_unread_count(self, user_id):
+        """Push the current unread count to the user's room"""
+        self._push(user_id, 'unread_count', {'unread_count': self.get_unread_count(user_id)})
+    
+    def _adjust_unread(self, user_id, delta):
+        """Atomically add delta to a user's unread counter"""
+        if not delta:
+            return
+        db.session.execute(
+            db.update(User)
+              .where(User.id == user_id)
+              # Keep updated_at: a counter change is not a profile edit
+              .values(unread_notifications=User.unread_notifications + delta,
+                      updated_at=User.updated_at),
+            execution_options={'synchronize_session': False}
+        )
+    
+    def reconcile_unread_counts(self, batch_size=1000):
+        """
+        Recompute the unread counter of every user whose counter drifted
+        
+        Algorithm: lock the drifted user rows (SELECT ... FOR UPDATE),
+        then set them with one correlated
+        `UPDATE users SET unread_notifications = (SELECT COUNT(*) ...)`
+        per batch of ids, in the same transaction. Increments take the
+        same row lock in the transaction that inserts the notification,
+        so each one has either committed (and is counted) or waits and
+        applies on top of the recount - none is overwritten.
+        
+        Args:
+            batch_size (int): User ids per UPDATE statement
+            
+        Returns:
+            int: Number of users updated
+        """
+        unread = db.select(db.func.count(Notification.id))\
+            .where(Notification.user_id == User.id, Notification.is_read == False)\
+            .scalar_subquery()
+        drifted = db.session.execute(
+            db.select(User.id).where(User.unread_notifications != unread).with_for_update()
+        ).scalars().all()
+        
+        for start in range(0, len(drifted), batch_size):
+            db.session.execute(
+                db.update(User)
+                  .where(User.id.in_(drifted[start:start + batch_size]))
+                  .values(unread_notifications=unread, updated_at=User.updated_at),
+                execution_options={'synchronize_session': False}
+            )
+        db.session.commit()
+        return len(drifted)
+    
+    def prune_read_notifications(self, older_than_days, batch_size=1000, max_batches=None):
+        """
+        Delete read notifications older than a given age, in batches
+        
+        Each batch selects up to batch_size ids (served by the
+        (is_read, created_at) index) and deletes them in its own
+        transaction, so locks are held only briefly and other writers
+        interleave between batches. Unread notifications are never
+        touched, so unread counters stay correct.
+        
+        Args:
+            older_than_days (int): Minimum age of a pruned notification
+            batch_size (int): Rows deleted per transaction
+            max_batches (int): Stop after this many batches (None = until done)
+            
+        Returns:
+            int: Number of notifications deleted
+        """
+        started = datetime.utcnow()
+        cutoff = started - timedelta(days=older_than_days)
+        pruned = 0
+        batches = 0
+        
+        while max_batches is None or batches < max_batches:
+            ids = db.session.execute(
+                db.select(Notification.id)
+                  .where(Notification.is_read == True, Notification.created_at < cutoff)
+                  .limit(batch_size)
+            ).scalars().all()
+            if not ids:
+                break
+            result = db.session.execute(
+                db.delete(Notification)
+                  .where(Notification.id.in_(ids), Notification.is_read == True),
+                execution_options={'synchronize_session': False}
+            )
+            db.session.commit()
+            pruned += result.rowcount
+            batches += 1
+            if len(ids) < batch_size:
+                break
+            # Let other greenlets/requests run between batches
+            socketio.sleep(0)
+        
+        metrics = self.retention_metrics
+        metrics['runs'] += 1
+        metrics['rows_pruned'] += pruned
+        metrics['last_run_at'] = started.isoformat()
+        metrics['last_run_pruned'] = pruned
+        metrics['last_run_batches'] = batches
+        metrics['last_run_seconds'] = round((datetime.utcnow() - started).total_seconds(), 3)
+        return pruned
+    
+    def run_retention(self):
+        """
+        Scheduled retention job (NOTIFICATION_RETENTION_DAYS, 0 = keep forever)
+        
+        Returns:
+            int: Number of notifications deleted
+        """
+        days = current_app.config.get('NOTIFICATION_RETENTION_DAYS', 90)
+        if not days:
+            return 0
+        pruned = self.prune_read_notifications(
+            days,
+            batch_size=current_app.config.get('NOTIFICATION_RETENTION_BATCH_SIZE', 1000)
+        )
+        if pruned:
+            print(f"✓ Pruned {pruned} read notifications older than {days} days")
+        return pruned
+    
     def create_notification(self, user_id, title, message, link=None):
-        """Create a new notification"""
+        """Create a new notification and push it to the user"""
         notification = Notification(
             user_id=user_id,
             title=title,
@@ -765,19 +1478,34 @@ class NotificationManager:
             link=link
         )
         db.session.add(notification)
+        self._adjust_unread(user_id, 1)
         db.session.commit()
+        
+        self._push(user_id, 'notification', {
+            'notification': self.to_dict(notification),
+            'unread_count': self.get_unread_count(user_id)
+        })
         return notification
     
     def get_unread_count(self, user_id):
-        """Get number of unread notifications"""
-        return Notification.query.filter_by(user_id=user_id, is_read=False).count()
+        """Get number of unread notifications (single-column primary key read)"""
+        count = db.session.query(User.unread_notifications).filter(User.id == user_id).scalar()
+        return max(count or 0, 0)
     
     def mark_as_read(self, notification_id):
         """Mark notification as read"""
         notification = Notification.query.get(notification_id)
         if notification:
-            notification.is_read = True
+            # Conditional update: only an unread -> read change is counted
+            result = db.session.execute(
+                db.update(Notification)
+                  .where(Notification.id == notification_id, Notification.is_read == False)
+                  .values(is_read=True),
+                execution_options={'synchronize_session': False}
+            )
+            self._adjust_unread(notification.user_id, -result.rowcount)
             db.session.commit()
+            self._push_unread_count(notification.user_id)
             return True
         return False
     
@@ -789,23 +1517,40 @@ class NotificationManager:
 
     def mark_all_read(self, user_id):
         """Mark all notifications as read for a user"""
-        Notification.query.filter_by(user_id=user_id, is_read=False).update({'is_read': True})
+        marked = Notification.query.filter_by(user_id=user_id, is_read=False)\
+            .update({'is_read': True}, synchronize_session=False)
+        self._adjust_unread(user_id, -marked)
         db.session.commit()
+        self._push_unread_count(user_id)
         return True
 
     def delete_notification(self, notification_id):
         """Delete a single notification"""
         notification = Notification.query.get(notification_id)
         if notification:
-            db.session.delete(notification)
+            user_id = notification.user_id
+            # Count the row only if this delete removed it while unread
+            result = db.session.execute(
+                db.delete(Notification)
+                  .where(Notification.id == notification_id, Notification.is_read == False),
+                execution_options={'synchronize_session': False}
+            )
+            self._adjust_unread(user_id, -result.rowcount)
+            if not result.rowcount:
+                Notification.query.filter_by(id=notification_id).delete(synchronize_session=False)
             db.session.commit()
+            self._push_unread_count(user_id)
             return True
         return False
 
     def clear_all(self, user_id):
         """Delete all notifications for a user"""
-        Notification.query.filter_by(user_id=user_id).delete()
+        unread = Notification.query.filter_by(user_id=user_id, is_read=False)\
+            .delete(synchronize_session=False)
+        Notification.query.filter_by(user_id=user_id).delete(synchronize_session=False)
+        self._adjust_unread(user_id, -unread)
         db.session.commit()
+        self._push_unread_count(user_id)
         return True
 
 
@@ -813,30 +1558,124 @@ class NotificationManager:
 class ChatManager:
     """
     Chat Management System for Orders
+    
+    Socket.IO connections are authorized once per order when they join
+    its room (see chat_access.py); sends from an authorized connection
+    skip the Order lookup
+    
+    With CHAT_WRITE_BEHIND, sent messages are buffered and inserted in
+    batches by chat_writer.py instead of committed one by one
     """
-    def send_message(self, order_id, sender_id, content):
-        """Send a message in an order chat"""
-        # Verify sender is part of order
+    def authorize(self, sid, order_id, user_id):
+        """
+        Check that a user is the order's buyer or seller and remember it
+        for the connection
+        
+        Args:
+            sid (str): Socket.IO connection ID
+            order_id (int): Order ID
+            user_id (int): Connected user
+            
+        Returns:
+            bool: True if authorized
+        """
+        generation = chat_access.generation(order_id)
         order = Order.query.get(order_id)
-        if not order:
-            return None, "Order not found"
+        if not order or user_id not in [order.buyer_id, order.seller_id]:
+            return False
+        chat_access.grant(sid, order_id, generation)
+        return True
+
+    def send_message(self, order_id, sender_id, content, sid=None):
+        """
+        Send a message in an order chat
+        
+        Args:
+            order_id (int): Order ID
+            sender_id (int): Sending user
+            content (str): Message text
+            sid (str): Socket.IO connection ID; a connection authorized by
+                       authorize() skips the permission query
             
-        if sender_id not in [order.buyer_id, order.seller_id]:
-            return None, "Unauthorized"
+        Returns:
+            tuple: (Message or None, error message or None)
+        """
+        if sid is None or not chat_access.allowed(sid, order_id):
+            # Verify sender is part of order
+            order = Order.query.get(order_id)
+            if not order:
+                return None, "Order not found"
+                
+            if sender_id not in [order.buyer_id, order.seller_id]:
+                return None, "Unauthorized"
             
         message = Message(
+            uid=uuid.uuid4().hex,
             order_id=order_id,
             sender_id=sender_id,
-            content=content
+            content=content,
+            created_at=datetime.utcnow()
         )
         
+        # Write-behind: the flusher inserts it; the returned message has no id yet
+        if chat_writer.enabled and chat_writer.enqueue({
+            'uid': message.uid,
+            'order_id': order_id,
+            'sender_id': sender_id,
+            'content': content,
+            'created_at': message.created_at,
+        }):
+            return message, None
+        
         db.session.add(message)
         db.session.commit()
         
         return message, None
 
-    def get_messages(self, order_id, user_id):
-        """Get messages for an order"""
+    @staticmethod
+    def to_dict(message, sender_name=None):
+        """
+        Serialize a chat message for clients (time shown in IST)
+        
+        Args:
+            message (Message): Stored or write-behind message
+            sender_name (str): Sender's username (default: loaded from message.sender)
+            
+        Returns:
+            dict: Message data; 'uid' identifies the message even before it has an id
+        """
+        created_at = message.created_at
+        if created_at.tzinfo is None:
+            created_at = pytz.UTC.localize(created_at)
+        ist_time = created_at.astimezone(pytz.timezone('Asia/Kolkata'))
+        
+        return {
+            'id': message.id,
+            'uid': message.uid,
+            'sender_id': message.sender_id,
+            'sender_name': sender_name or message.sender.username,
+            'content': message.content,
+            'created_at': ist_time.isoformat(),
+            'time_display': ist_time.strftime('%I:%M %p')
+        }
+
+    def get_messages(self, order_id, user_id, before=None, limit=None):
+        """
+        Get messages for an order, oldest first
+        
+        Algorithm: KEYSET PAGINATION on (created_at, id), newest first,
+        served by the (order_id, created_at) index; the page is reversed
+        into reading order
+        
+        Args:
+            order_id (int): Order ID
+            user_id (int): Requesting user (buyer, seller or admin)
+            before (str): Cursor from get_history; only older messages are returned
+            limit (int): Latest messages to return (None = the whole history)
+            
+        Returns:
+            list: Message objects (empty if unauthorized)
+        """
         # Verify permissions
         order = Order.query.get(order_id)
         if not order:
@@ -844,8 +1683,48 @@ class ChatManager:
             
         if user_id not in [order.buyer_id, order.seller_id] and not User.query.get(user_id).is_admin():
             return []
+        
+        messages = Message.query.filter_by(order_id=order_id)\
+            .options(db.joinedload(Message.sender))
+        
+        older_than = decode_cursor(before, [datetime, int])
+        if older_than is not None:
+            messages = messages.filter(
+                db.tuple_(Message.created_at, Message.id) < db.tuple_(*older_than)
+            )
+        
+        if limit is None:
+            return messages.order_by(Message.created_at, Message.id).all()
+        
+        page = messages.order_by(Message.created_at.desc(), Message.id.desc()).limit(limit).all()
+        page.reverse()
+        return page
+
+    def get_history(self, order_id, user_id, before=None, limit=None):
+        """
+        Get one page of chat history: the latest messages, or the ones
+        before a cursor
+        
+        Args:
+            order_id (int): Order ID
+            user_id (int): Requesting user
+            before (str): Cursor from the previous page (None for the latest)
+            limit (int): Page size (default CHAT_HISTORY_PAGE_SIZE)
             
-        return Message.query.filter_by(order_id=order_id).order_by(Message.created_at).all()
+        Returns:
+            tuple: (list of Message objects oldest first, cursor for older messages or None)
+        """
+        if limit is None:
+            limit = current_app.config.get('CHAT_HISTORY_PAGE_SIZE', 50)
+        
+        # One extra row tells whether older messages exist
+        messages = self.get_messages(order_id, user_id, before=before, limit=limit + 1)
+        if len(messages) <= limit:
+            return messages, None
+        
+        messages = messages[1:]
+        oldest = messages[0]
+        return messages, encode_cursor([oldest.created_at, oldest.id])
 
     def get_active_chats(self, user_id):
         """
@@ -874,3 +1753,5 @@ order_manager = OrderManager()
 category_manager = CategoryManager()
 notification_manager = NotificationManager()
 chat_manager = ChatManager()
+stats_manager = StatsManager()
+community_manager = CommunityManager()
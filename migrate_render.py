@@ -3,8 +3,9 @@ Render Deployment Database Initialization Script
 
 This script runs during Render deployment to:
 1. Create all database tables
-2. Initialize default admin user
-3. Seed initial categories
+2. Apply schema upgrades (migrations.py), once per release
+3. Initialize default admin user
+4. Seed initial categories
 
 Author: SkillBridge Team
 """
@@ -30,6 +31,12 @@ def initialize_database():
             db.create_all()
             print("✅ Database tables created!")
             
+            # Workers skip this at boot when AUTO_MIGRATE is off
+            from migrations import upgrade_schema
+            print("🔄 Applying schema upgrades...")
+            upgrade_schema()
+            print("✅ Schema up to date!")
+            
             # Initialize default data
             from init_db import create_default_admin, seed_categories
             
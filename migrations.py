@@ -0,0 +1,201 @@
+"""
+Schema Upgrades and Backfills for SkillBridge
+
+db.create_all() only creates missing TABLES; it never changes a table
+that already exists. This module brings existing databases (Render
+PostgreSQL, local SQLite) up to date in place:
+1. Adds columns introduced after the table was created
+2. Creates indexes declared on the models but missing in the database
+3. Backfills denormalized columns when they are first added
+
+It runs from create_app() unless AUTO_MIGRATE is off; deployments with
+several workers should run it once as a release step instead
+(migrate_render.py does this during the Render build).
+
+Usage:
+    python migrations.py                    # apply schema upgrades
+    python migrations.py backfill-ratings   # recompute service rating aggregates
+    python migrations.py reconcile-counters # recompute site-wide counters
+    python migrations.py backfill-member-counts  # recompute community member counts
+    python migrations.py reconcile-unread   # recompute unread notification counts
+    python migrations.py prune-notifications  # apply notification retention now
+
+Author: SkillBridge Team
+Purpose: Idempotent schema migrations
+"""
+
+import sys
+from contextlib import contextmanager
+from sqlalchemy.exc import DBAPIError
+from models import db, Service, Review, Community, CommunityMember
+
+
+def backfill_ratings():
+    """
+    Recompute rating_sum, rating_count and rating_avg for every service
+
+    Algorithm: two set-based UPDATE statements with correlated
+    subqueries - no rows are loaded into Python
+    """
+    review_sum = db.select(db.func.coalesce(db.func.sum(Review.rating), 0))\
+        .where(Review.service_id == Service.id).scalar_subquery()
+    review_count = db.select(db.func.count(Review.id))\
+        .where(Review.service_id == Service.id).scalar_subquery()
+
+    db.session.execute(
+        db.update(Service).values(rating_sum=review_sum, rating_count=review_count),
+        execution_options={'synchronize_session': False}
+    )
+    db.session.execute(
+        db.update(Service).values(rating_avg=db.case(
+            (Service.rating_count > 0, Service.rating_sum * 1.0 / Service.rating_count),
+            else_=0.0
+        )),
+        execution_options={'synchronize_session': False}
+    )
+    db.session.commit()
+    print("✓ Service rating aggregates backfilled")
+
+
+def backfill_member_counts():
+    """Recompute members_count for every community (one UPDATE)"""
+    member_count = db.select(db.func.count(CommunityMember.id))\
+        .where(CommunityMember.community_id == Community.id).scalar_subquery()
+    db.session.execute(
+        db.update(Community).values(members_count=member_count),
+        execution_options={'synchronize_session': False}
+    )
+    db.session.commit()
+    print("✓ Community member counts backfilled")
+
+
+def backfill_unread_counts():
+    """Recompute users.unread_notifications"""
+    from managers import notification_manager
+    notification_manager.reconcile_unread_counts()
+    print("✓ Unread notification counts backfilled")
+
+
+# Columns added after the first release: (table, column, DDL type, backfill)
+# The backfill runs once, right after the column is created
+COLUMN_UPGRADES = [
+    ('services', 'rating_sum', 'INTEGER NOT NULL DEFAULT 0', backfill_ratings),
+    ('services', 'rating_count', 'INTEGER NOT NULL DEFAULT 0', backfill_ratings),
+    ('services', 'rating_avg', 'FLOAT NOT NULL DEFAULT 0', backfill_ratings),
+    ('communities', 'members_count', 'INTEGER NOT NULL DEFAULT 0', backfill_member_counts),
+    ('users', 'unread_notifications', 'INTEGER NOT NULL DEFAULT 0', backfill_unread_counts),
+    ('messages', 'uid', 'VARCHAR(32)', None),
+]
+
+
+# PostgreSQL advisory lock key held while upgrade_schema runs
+MIGRATION_LOCK_KEY = 7_405_319
+
+
+@contextmanager
+def migration_lock():
+    """
+    Serialize schema upgrades across processes
+
+    Every gunicorn worker runs create_app(), so several may upgrade the
+    same database at once. On PostgreSQL they queue on an advisory lock;
+    elsewhere each statement is checked and guarded on its own.
+    """
+    if db.engine.dialect.name != 'postgresql':
+        yield
+        return
+    with db.engine.connect() as connection:
+        connection.execute(db.text('SELECT pg_advisory_lock(:key)'), {'key': MIGRATION_LOCK_KEY})
+        try:
+            yield
+        finally:
+            connection.execute(db.text('SELECT pg_advisory_unlock(:key)'), {'key': MIGRATION_LOCK_KEY})
+
+
+def _column_names(table):
+    """Current column names of a table (fresh inspection, no cache)"""
+    return {col['name'] for col in db.inspect(db.engine).get_columns(table)}
+
+
+def upgrade_schema():
+    """
+    Add missing columns and indexes (idempotent, safe to run concurrently)
+
+    Each statement runs on its own: a column or index that fails (e.g.
+    because another process created it first) is reported and the rest
+    of the upgrade still runs. Must be called inside an application
+    context, after db.create_all().
+    """
+    backfills = []
+
+    with migration_lock():
+        for table, column, ddl, backfill in COLUMN_UPGRADES:
+            if column in _column_names(table):
+                continue
+            try:
+                with db.engine.begin() as connection:
+                    connection.execute(db.text(f'ALTER TABLE {table} ADD COLUMN {column} {ddl}'))
+            except DBAPIError as e:
+                if column not in _column_names(table):
+                    print(f"⚠️  Could not add column {table}.{column}: {e}")
+                continue  # added by another process otherwise
+            print(f"✓ Added column {table}.{column}")
+            if backfill and backfill not in backfills:
+                backfills.append(backfill)
+
+        # Create any index declared on a model but missing in the database
+        for table in db.metadata.sorted_tables:
+            for index in table.indexes:
+                try:
+                    index.create(db.engine, checkfirst=True)
+                except DBAPIError as e:
+                    print(f"⚠️  Could not create index {index.name}: {e}")
+
+        for backfill in backfills:
+            try:
+                backfill()
+            except DBAPIError as e:
+                db.session.rollback()
+                print(f"⚠️  Backfill {backfill.__name__} failed: {e}")
+
+
+def prune_notifications():
+    """Delete read notifications past NOTIFICATION_RETENTION_DAYS"""
+    from managers import notification_manager
+    pruned = notification_manager.run_retention()
+    print(f"✓ Notification retention applied ({pruned} pruned)")
+
+
+def reconcile_site_counters():
+    """Recompute the materialized site counters (see site_counters.py)"""
+    from site_counters import reconcile_counters
+    print(f"✓ Site counters reconciled: {reconcile_counters()}")
+
+
+COMMANDS = {
+    'backfill-ratings': backfill_ratings,
+    'reconcile-counters': reconcile_site_counters,
+    'backfill-member-counts': backfill_member_counts,
+    'reconcile-unread': backfill_unread_counts,
+    'prune-notifications': prune_notifications,
+}
+
+
+if __name__ == '__main__':
+    """
+    Run schema upgrades (create_app applies them) and optional backfills
+    """
+    from app import create_app
+
+    app = create_app()
+
+    with app.app_context():
+        upgrade_schema()
+        for name in sys.argv[1:]:
+            command = COMMANDS.get(name)
+            if command is None:
+                print(f"❌ Unknown command: {name} (available: {', '.join(COMMANDS)})")
+                sys.exit(1)
+            command()
+
+        print("\n✓ Migrations complete!")
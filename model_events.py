@@ -0,0 +1,212 @@
+"""
+Model Change Events for SkillBridge
+
+This module bridges SQLAlchemy mapper events to in-process subscribers
+(search index, caches, leaderboards).
+
+Design:
+- Mapper events (after_insert / after_update / after_delete) record a
+  SNAPSHOT of the changed row in the session while it flushes
+- Session events replay the snapshots to subscribers only after the
+  transaction COMMITS, so a rolled back write never reaches memory
+- Forwarders (the cross-worker invalidation bus) receive the same
+  committed changes; other workers get only the IDs and changed field
+  names (see summarize_service_changes) and reload the rows from the
+  database with load_service_changes() before replaying them to their
+  local subscribers with apply_remote_service_changes()
+
+Author: SkillBridge Team
+Purpose: Keep in-memory data structures in sync with the database
+"""
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+from models import db, Service
+
+
+# Columns copied into every Service snapshot
+SERVICE_FIELDS = ('title', 'description', 'tags', 'is_active', 'category_id', 'price',
+                  'rating_avg', 'rating_count')
+
+# Key under which pending changes are stored in Session.info
+_PENDING_KEY = 'skillbridge_service_changes'
+
+# Registered subscriber callbacks (LIST keeps registration order)
+_service_subscribers = []
+
+# Callbacks that send local changes to other processes
+_service_forwarders = []
+
+
+def on_service_change(callback):
+    """
+    Register a callback for committed Service changes
+
+    The callback receives a list of change dictionaries:
+    - 'id': Service ID
+    - 'deleted': True if the row was deleted
+    - 'changed': SET of field names that changed
+    - one key per field in SERVICE_FIELDS with the committed value
+
+    Args:
+        callback (callable): Function accepting a list of changes
+
+    Returns:
+        callable: The same callback (usable as a decorator)
+    """
+    _service_subscribers.append(callback)
+    return callback
+
+
+def forward_service_changes(callback):
+    """
+    Register a callback that publishes committed local changes elsewhere
+
+    Args:
+        callback (callable): Function accepting a list of changes
+
+    Returns:
+        callable: The same callback
+    """
+    _service_forwarders.append(callback)
+    return callback
+
+
+def _notify(callbacks, changes):
+    """Call each callback, logging (not raising) failures"""
+    for callback in callbacks:
+        try:
+            callback(changes)
+        except Exception as e:
+            print(f"⚠️  Service change subscriber failed: {e}")
+
+
+def notify_service_changes(changes):
+    """
+    Announce committed changes made without the ORM unit of work
+    (e.g. bulk UPDATE statements), to local subscribers and forwarders
+
+    Args:
+        changes (list): Change dictionaries (see on_service_change)
+    """
+    _notify(_service_subscribers, changes)
+    _notify(_service_forwarders, changes)
+
+
+def apply_remote_service_changes(changes):
+    """
+    Replay changes committed by another process to local subscribers
+
+    Args:
+        changes (list): Change dictionaries (see on_service_change)
+    """
+    _notify(_service_subscribers, changes)
+
+
+def summarize_service_changes(changes):
+    """
+    Reduce changes to what another process needs to reload them: no row
+    contents, so a message stays small whatever the description length
+
+    Args:
+        changes (list): Change dictionaries (see on_service_change)
+
+    Returns:
+        list: {'id', 'deleted', 'changed' (sorted list)} dictionaries
+    """
+    return [{'id': change['id'], 'deleted': change['deleted'],
+             'changed': sorted(change['changed'])} for change in changes]
+
+
+def load_service_changes(summaries):
+    """
+    Rebuild full change dictionaries from summaries by reading the
+    current rows (one query); a row that no longer exists is reported
+    as deleted
+
+    Must be called inside an application context.
+
+    Args:
+        summaries (list): Output of summarize_service_changes()
+
+    Returns:
+        list: Change dictionaries (see on_service_change)
+    """
+    ids = [summary['id'] for summary in summaries]
+    columns = [getattr(Service, field) for field in SERVICE_FIELDS]
+    rows = {row[0]: row[1:] for row in
+            db.session.query(Service.id, *columns).filter(Service.id.in_(ids)).all()}
+
+    changes = []
+    for summary in summaries:
+        row = rows.get(summary['id'])
+        deleted = summary['deleted'] or row is None
+        change = {'id': summary['id'], 'deleted': deleted, 'changed': set(summary['changed'])}
+        if deleted:
+            change['changed'] = set(SERVICE_FIELDS)
+            change.update(dict.fromkeys(SERVICE_FIELDS))
+        else:
+            change.update(zip(SERVICE_FIELDS, row))
+        changes.append(change)
+    return changes
+
+
+def _record_service_change(target, changed, deleted=False):
+    """
+    Store a snapshot of a Service row in its session
+
+    Data Structure: DICTIONARY keyed by service ID, so several flushes
+    in one transaction collapse into a single change per service
+    """
+    session = object_session(target)
+    if session is None or target.id is None:
+        return
+
+    pending = session.info.setdefault(_PENDING_KEY, {})
+    change = pending.get(target.id)
+    if change is None:
+        change = {'id': target.id, 'deleted': False, 'changed': set()}
+        pending[target.id] = change
+
+    change['deleted'] = deleted
+    change['changed'].update(changed)
+    for field in SERVICE_FIELDS:
+        change[field] = getattr(target, field)
+
+
+@event.listens_for(Service, 'after_insert')
+def _service_inserted(mapper, connection, target):
+    """Record a newly inserted service"""
+    _record_service_change(target, SERVICE_FIELDS)
+
+
+@event.listens_for(Service, 'after_update')
+def _service_updated(mapper, connection, target):
+    """Record an updated service (ignores unrelated columns like view_count)"""
+    state = inspect(target)
+    changed = {field for field in SERVICE_FIELDS
+               if state.attrs[field].history.has_changes()}
+    if changed:
+        _record_service_change(target, changed)
+
+
+@event.listens_for(Service, 'after_delete')
+def _service_deleted(mapper, connection, target):
+    """Record a deleted service"""
+    _record_service_change(target, SERVICE_FIELDS, deleted=True)
+
+
+@event.listens_for(Session, 'after_commit')
+def _dispatch_service_changes(session):
+    """Hand committed changes to every subscriber"""
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+
+    notify_service_changes(list(pending.values()))
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_service_changes(session):
+    """Forget changes from a rolled back transaction"""
+    session.info.pop(_PENDING_KEY, None)
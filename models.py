@@ -19,14 +19,32 @@ Author: SkillBridge Team
 Purpose: Define database schema and model behavior
 """
 
+import uuid
 from datetime import datetime
+from flask.globals import app_ctx
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
 
+try:
+    from greenlet import getcurrent as _current_task
+except ImportError:
+    from threading import get_ident as _current_task
+
+
+def _session_scope():
+    """
+    Scope key for db.session: the app context AND the current greenlet
+    (in threading mode, each thread's main greenlet), so concurrent
+    greenlets under eventlet/gevent never share a Session even when
+    they run inside the same app context
+    """
+    return id(app_ctx._get_current_object()), id(_current_task())
+
+
 # Initialize SQLAlchemy database object
 # This will be configured in app.py
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'scopefunc': _session_scope})
 
 
 class User(UserMixin, db.Model):
@@ -69,6 +87,9 @@ class User(UserMixin, db.Model):
     is_active = db.Column(db.Boolean, default=True)
     is_verified = db.Column(db.Boolean, default=False)
     
+    # Denormalized unread notification count (maintained by NotificationManager)
+    unread_notifications = db.Column(db.Integer, default=0, nullable=False)
+    
     # Timestamps
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -159,7 +180,7 @@ class User(UserMixin, db.Model):
         Returns:
             int: Total review count
         """
-        return sum(service.reviews.count() for service in self.get_services())
+        return sum(service.get_review_count() for service in self.get_services())
     
     def is_admin(self):
         """
@@ -171,8 +192,8 @@ class User(UserMixin, db.Model):
         return self.user_type == 'admin'
     
     def get_unread_notifications_count(self):
-        """Get count of unread notifications"""
-        return self.notifications.filter_by(is_read=False).count()
+        """Get count of unread notifications (denormalized column, no query)"""
+        return max(self.unread_notifications or 0, 0)
     
     def get_recent_notifications(self, limit=5):
         """Get recent notifications ordered by date"""
@@ -248,8 +269,7 @@ class Category(db.Model):
         """
         Get top-rated services in this category
         
-        Data Structure: Uses Python's sorted() with custom key
-        Algorithm: Sort by average rating descending
+        Algorithm: ORDER BY the denormalized rating_avg column in SQL
         
         Args:
             limit (int): Maximum number of services to return
@@ -257,12 +277,9 @@ class Category(db.Model):
         Returns:
             list: Top-rated Service objects
         """
-        services = self.services.filter_by(is_active=True).all()
-        # Sort by average rating (highest first)
-        sorted_services = sorted(services, 
-                                key=lambda s: s.get_average_rating(), 
-                                reverse=True)
-        return sorted_services[:limit]
+        return self.services.filter_by(is_active=True)\
+                            .order_by(Service.rating_avg.desc())\
+                            .limit(limit).all()
     
     def __repr__(self):
         """String representation of Category object"""
@@ -284,6 +301,7 @@ class Service(db.Model):
     - Many-to-One: Service belongs to User
     - Many-to-One: Service belongs to Category
     - One-to-Many: Service has many Reviews
+    - Denormalization: rating_sum / rating_count / rating_avg
     """
     
     __tablename__ = 'services'
@@ -316,6 +334,12 @@ class Service(db.Model):
     # Statistics
     view_count = db.Column(db.Integer, default=0)
     
+    # Denormalized rating aggregates (maintained by ReviewSystem)
+    # Reading a column avoids loading every Review row per service
+    rating_sum = db.Column(db.Integer, default=0, nullable=False)
+    rating_count = db.Column(db.Integer, default=0, nullable=False)
+    rating_avg = db.Column(db.Float, default=0.0, nullable=False, index=True)
+    
     # Timestamps
     created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -332,33 +356,37 @@ class Service(db.Model):
     favorited_by = db.relationship('Favorite', backref='service', lazy='dynamic',
                                    cascade='all, delete-orphan')
     
+    # Composite indexes for keyset-paginated browsing:
+    # (filter, sort key..., id) lets each page be a single index range scan
+    __table_args__ = (
+        db.Index('idx_services_active_price', 'is_active', 'price', 'id'),
+        db.Index('idx_services_active_rating', 'is_active', 'rating_avg', 'rating_count', 'id'),
+        db.Index('idx_services_active_created', 'is_active', 'created_at', 'id'),
+        db.Index('idx_services_category_rating', 'category_id', 'is_active',
+                 'rating_avg', 'rating_count', 'id'),
+    )
+    
     def get_average_rating(self):
         """
-        Calculate average rating for this service
+        Get average rating for this service
         
-        Algorithm:
-        1. Get all reviews for this service
-        2. Calculate sum of ratings
-        3. Divide by count
+        Reads the denormalized rating_avg column - O(1), no query
         
         Returns:
             float: Average rating (0.0 to 5.0)
         """
-        reviews = self.reviews.all()
-        if not reviews:
-            return 0.0
-        
-        total_rating = sum(review.rating for review in reviews)
-        return round(total_rating / len(reviews), 1)
+        return round(self.rating_avg or 0.0, 1)
     
     def get_review_count(self):
         """
         Get total number of reviews
         
+        Reads the denormalized rating_count column - O(1), no query
+        
         Returns:
             int: Review count
         """
-        return self.reviews.count()
+        return self.rating_count or 0
     
     def get_tags_list(self):
         """
@@ -378,9 +406,21 @@ class Service(db.Model):
         Increment view count for this service
         
         OOP Concept: ENCAPSULATION - Internal state modification
+        The view is buffered in memory and written in a periodic batch
+        (see view_counter.py), so no commit happens per page view
+        """
+        from view_counter import view_counter
+        view_counter.record(self.id)
+    
+    def get_view_count(self):
         """
-        self.view_count += 1
-        db.session.commit()
+        Get view count including views not yet flushed
+        
+        Returns:
+            int: Total views
+        """
+        from view_counter import view_counter
+        return (self.view_count or 0) + view_counter.pending(self.id)
     
     def is_favorited_by(self, user):
         """
@@ -436,6 +476,7 @@ class Review(db.Model):
     # Composite index for faster queries
     __table_args__ = (
         db.Index('idx_service_user', 'service_id', 'user_id'),
+        db.Index('idx_review_service_rating', 'service_id', 'rating'),  # covers rating GROUP BY
     )
     
     def validate_rating(self):
@@ -578,6 +619,13 @@ class Notification(db.Model):
     is_read = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    # Composite indexes for the per-user access patterns
+    __table_args__ = (
+        db.Index('idx_notifications_user_read', 'user_id', 'is_read'),  # unread filters and bulk updates
+        db.Index('idx_notifications_user_created', user_id, created_at.desc()),  # latest-first lists
+        db.Index('idx_notifications_read_created', 'is_read', 'created_at'),  # retention pruning
+    )
+    
     def __repr__(self):
         return f'<Notification {self.title}>'
 
@@ -594,6 +642,14 @@ class Message(db.Model):
     content = db.Column(db.Text, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    # Client-visible ID, assigned before the row is written (write-behind
+    # chat broadcasts messages before they have a database id)
+    uid = db.Column(db.String(32), unique=True, index=True, default=lambda: uuid.uuid4().hex)
+    
+    __table_args__ = (
+        db.Index('idx_messages_order_created', 'order_id', 'created_at'),  # chat history in order
+    )
+    
     # Relationships
     order = db.relationship('Order', backref=db.backref('messages', lazy='dynamic'))
     sender = db.relationship('User', backref='sent_messages')
@@ -863,6 +919,7 @@ class Community(db.Model):
     - Primary Key: id
     - One-to-Many: Community has many members
     - Timestamps for ordering
+    - Denormalization: members_count (maintained by CommunityManager)
     """
     
     __tablename__ = 'communities'
@@ -879,6 +936,9 @@ class Community(db.Model):
     # Status
     is_active = db.Column(db.Boolean, default=True)
     
+    # Denormalized member count (updated atomically on join/leave)
+    members_count = db.Column(db.Integer, default=0, nullable=False)
+    
     # Timestamps
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -888,12 +948,18 @@ class Community(db.Model):
                              cascade='all, delete-orphan')
     
     def get_members_count(self):
-        """Get total number of members in this community"""
-        return self.members.count()
+        """Get total number of members in this community (denormalized column)"""
+        return self.members_count or 0
     
     def is_member(self, user_id):
-        """Check if user is a member of this community"""
-        return self.members.filter_by(user_id=user_id).first() is not None
+        """
+        Check if user is a member of this community
+        
+        EXISTS probe on the unique (user_id, community_id) index
+        """
+        return db.session.query(
+            CommunityMember.query.filter_by(user_id=user_id, community_id=self.id).exists()
+        ).scalar()
     
     def __repr__(self):
         return f'<Community {self.name}>'
@@ -925,9 +991,29 @@ class CommunityMember(db.Model):
     user = db.relationship('User', backref=db.backref('community_memberships', lazy='dynamic'))
     
     # Ensure a user can't join the same community twice
+    # (the unique index also serves is_member lookups)
     __table_args__ = (
         db.UniqueConstraint('user_id', 'community_id', name='unique_user_community'),
     )
     
     def __repr__(self):
-        return f'<CommunityMember User {self.user_id} - Community {self.community_id}>'
\ No newline at end of file
+        return f'<CommunityMember User {self.user_id} - Community {self.community_id}>'
+
+
+class SiteCounter(db.Model):
+    """
+    SiteCounter Model - Materialized site-wide counts
+    
+    DBMS Concepts:
+    - Primary Key: name (one row per counter)
+    - Denormalization: totals maintained on every write (see
+      site_counters.py) so pages read them without COUNT(*) scans
+    """
+    
+    __tablename__ = 'site_counters'
+    
+    name = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.BigInteger, default=0, nullable=False)
+    
+    def __repr__(self):
+        return f'<SiteCounter {self.name}={self.value}>'
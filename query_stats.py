@@ -0,0 +1,245 @@
+"""
+Request-Scoped Query Statistics for SkillBridge
+
+This module hooks SQLAlchemy ENGINE EVENTS to measure the SQL each
+request issues:
+- number of queries and total time spent in the database
+- N+1 detection: the same statement text executed many times in one
+  request (typically a lazy relationship or per-row count() in a loop),
+  reported with the route and the code that issued it
+
+Output:
+- Development (QUERY_STATS_HEADERS): X-Query-Count, X-Query-Time-Ms and
+  X-N-Plus-One response headers
+- Production: one log line per request, plus a warning per N+1 pattern,
+  on the 'skillbridge.query_stats' logger (INFO level and its own
+  stderr handler, so the lines survive the app logger's WARNING level)
+
+Data Structures: Dictionary (statement -> count), List (call sites)
+
+Author: SkillBridge Team
+Purpose: Make query fan-out visible
+"""
+
+import logging
+import os
+import sys
+import sysconfig
+import time
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+# Source files under this directory count as application code...
+_THIS_FILE = os.path.abspath(__file__)
+_APP_ROOT = os.path.dirname(_THIS_FILE)
+_APP_DIR = os.path.join(_APP_ROOT, '')
+
+
+def _library_dirs():
+    """
+    Directories of installed packages and of the interpreter
+
+    A virtualenv may live inside the project (venv/, .venv/), so these
+    are excluded even though they are under _APP_ROOT. Prefixes that
+    contain the application itself are left out.
+
+    Returns:
+        tuple: Absolute directory paths, each ending with a separator
+    """
+    paths = sysconfig.get_paths()
+    candidates = {paths.get('purelib'), paths.get('platlib'),
+                  sys.prefix, sys.base_prefix, sys.exec_prefix}
+    dirs = []
+    for path in filter(None, candidates):
+        path = os.path.join(os.path.abspath(path), '')
+        if not _APP_DIR.startswith(path):
+            dirs.append(path)
+    return tuple(dirs)
+
+
+# ...except installed libraries (e.g. SQLAlchemy in a project-local venv)
+_LIBRARY_DIRS = _library_dirs()
+_PACKAGE_DIR_NAMES = ('site-packages', 'dist-packages')
+
+
+def _is_app_file(filename):
+    """
+    Check if a source file belongs to the application
+
+    Args:
+        filename (str): Absolute path of a frame's source file
+
+    Returns:
+        bool: True for project code, False for libraries and this module
+    """
+    if filename == _THIS_FILE or not filename.startswith(_APP_DIR):
+        return False
+    if filename.startswith(_LIBRARY_DIRS):
+        return False
+    parts = filename.split(os.sep)
+    return not any(name in parts for name in _PACKAGE_DIR_NAMES)
+
+# Number of call-site frames reported for an N+1 statement
+_ORIGIN_DEPTH = 3
+
+# Dedicated logger: Flask's app.logger drops INFO in production
+logger = logging.getLogger('skillbridge.query_stats')
+
+
+def _configure_logger():
+    """Give the query statistics logger its own level and handler (once)"""
+    if logger.handlers:
+        return
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter('[%(asctime)s] %(levelname)s in query_stats: %(message)s'))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+class RequestQueryStats:
+    """
+    Query statistics for one request
+
+    Attributes:
+        count (int): Statements executed
+        total_time (float): Seconds spent executing them
+        statements (dict): Statement text -> execution count
+        origins (dict): Statement text -> call sites, for flagged statements
+    """
+
+    def __init__(self, threshold):
+        """
+        Args:
+            threshold (int): Executions of one statement that flag an N+1
+        """
+        self.threshold = threshold
+        self.count = 0
+        self.total_time = 0.0
+        self.statements = {}
+        self.origins = {}
+
+    def record(self, statement, elapsed):
+        """
+        Count one executed statement
+
+        The call stack is only inspected once, when a statement first
+        reaches the threshold, so normal queries stay cheap.
+        """
+        self.count += 1
+        self.total_time += elapsed
+        seen = self.statements.get(statement, 0) + 1
+        self.statements[statement] = seen
+        if seen == self.threshold:
+            self.origins[statement] = _call_sites()
+
+    def repeated(self):
+        """
+        Get the flagged statements
+
+        Returns:
+            list: (statement, count, call sites), most repeated first
+        """
+        flagged = [(statement, self.statements[statement], sites)
+                   for statement, sites in self.origins.items()]
+        flagged.sort(key=lambda item: item[1], reverse=True)
+        return flagged
+
+
+def _call_sites():
+    """
+    Find the application frames that issued the current query
+
+    Returns:
+        list: 'file:line in function' strings, innermost first
+              (templates appear as their .html file)
+    """
+    sites = []
+    frame = sys._getframe(1)
+    while frame is not None and len(sites) < _ORIGIN_DEPTH:
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if _is_app_file(filename):
+            relative = os.path.relpath(filename, _APP_ROOT)
+            sites.append(f"{relative}:{frame.f_lineno} in {frame.f_code.co_name}")
+        frame = frame.f_back
+    return sites
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    """Start timing a statement"""
+    if context is not None:
+        context._query_stats_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    """Record a finished statement against the current request"""
+    if not has_request_context():
+        return
+    stats = g.get('query_stats')
+    if stats is None:
+        return
+    started = getattr(context, '_query_stats_start', None)
+    elapsed = time.perf_counter() - started if started is not None else 0.0
+    stats.record(statement, elapsed)
+
+
+def init_query_stats(app):
+    """
+    Enable query statistics for an application
+
+    Config:
+        QUERY_STATS_ENABLED (bool): Turn the instrumentation on
+        QUERY_STATS_HEADERS (bool): Report in response headers instead of the log
+        N_PLUS_ONE_THRESHOLD (int): Repeats of one statement that flag an N+1
+
+    Args:
+        app: Flask application
+    """
+    if not app.config.get('QUERY_STATS_ENABLED', True):
+        return
+
+    # Engine-class listeners cover every engine; register them once
+    if not event.contains(Engine, 'after_cursor_execute', _after_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+
+    _configure_logger()
+
+    threshold = app.config.get('N_PLUS_ONE_THRESHOLD', 5)
+    use_headers = app.config.get('QUERY_STATS_HEADERS', False)
+
+    @app.before_request
+    def start_query_stats():
+        """Attach a fresh counter to the request"""
+        g.query_stats = RequestQueryStats(threshold)
+
+    @app.after_request
+    def report_query_stats(response):
+        """Publish the request's query statistics"""
+        stats = g.pop('query_stats', None)
+        if stats is None or stats.count == 0:
+            return response
+
+        route = request.endpoint or request.path
+        repeated = stats.repeated()
+        total_ms = stats.total_time * 1000
+
+        if use_headers:
+            response.headers['X-Query-Count'] = str(stats.count)
+            response.headers['X-Query-Time-Ms'] = f"{total_ms:.1f}"
+            response.headers['X-N-Plus-One'] = str(len(repeated))
+        else:
+            logger.info(
+                f"{request.method} {request.path} [{route}]: "
+                f"{stats.count} queries in {total_ms:.1f} ms"
+            )
+
+        for statement, count, sites in repeated:
+            logger.warning(
+                f"Possible N+1 in {route}: statement ran {count} times, "
+                f"from {' <- '.join(sites) or 'unknown'}: {' '.join(statement.split())[:200]}"
+            )
+
+        return response
@@ -22,7 +22,8 @@ from flask_login import login_user, logout_user, login_required, current_user
 from functools import wraps
 from models import db, User, Service, Category, Review, Order, Favorite, Notification, Message, ProjectShowcase
 from managers import (service_manager, user_manager, search_engine, 
-                     review_system, order_manager, category_manager, notification_manager, chat_manager)
+                     review_system, order_manager, category_manager, notification_manager, chat_manager,
+                     stats_manager, community_manager)
 from werkzeug.utils import secure_filename
 import os
 from flask import current_app
@@ -132,24 +133,17 @@ def index():
     # Get featured services using ServiceManager
     featured_services = service_manager.get_featured_services(limit=4)
     
-    # Get all categories
-    categories = category_manager.get_all_categories()
-    
-    # Get category stats
+    # Get category stats (one cached grouped query); the category list is
+    # built from the same rows instead of another Category query
     category_stats = category_manager.get_category_stats()
+    categories = category_stats
     
     # Get communities for homepage (limit to 4)
     from models import Community
     communities = Community.query.filter_by(is_active=True).limit(4).all()
-    for community in communities:
-        community.members_count = community.get_members_count()
-    
-    # Get stats for home page
-    stats_data = {
-        'total_users': User.query.count(),
-        'total_services': Service.query.filter_by(is_active=True).count(),
-        'total_reviews': Review.query.count()
-    }
+    
+    # Get stats for home page (cached, see StatsManager)
+    stats_data = stats_manager.get_homepage_stats()
     
     return render_template('index.html',
                          featured_services=featured_services,
@@ -163,22 +157,9 @@ def index():
 @main_bp.route('/about')
 def about():
     """About page"""
-    # Get stats for about page
-    # Calculate average rating from website reviews (user feedback about SkillBridge)
-    from models import WebsiteReview
-    website_reviews = WebsiteReview.query.filter_by(is_approved=True).all()
-    if website_reviews:
-        total_rating = sum(review.rating for review in website_reviews)
-        average_rating = round(total_rating / len(website_reviews), 1)
-    else:
-        average_rating = 0.0
-    
-    stats_data = {
-        'total_users': User.query.count(),
-        'total_services': Service.query.filter_by(is_active=True).count(),
-        'total_reviews': WebsiteReview.query.filter_by(is_approved=True).count(),
-        'average_rating': average_rating
-    }
+    # Get stats for about page (materialized counters, see StatsManager)
+    # Average rating is from website reviews (user feedback about SkillBridge)
+    stats_data = stats_manager.get_about_stats()
     return render_template('about.html', stats_data=stats_data)
 
 
@@ -232,13 +213,11 @@ def communities():
     from models import Community
     all_communities = Community.query.filter_by(is_active=True).all()
     
-    # Add member count and membership status for each community
+    # Membership status for each community (members_count is a column)
+    joined_ids = community_manager.get_joined_ids(current_user.id) \
+        if current_user.is_authenticated else set()
     for community in all_communities:
-        community.members_count = community.get_members_count()
-        if current_user.is_authenticated:
-            community.is_joined = community.is_member(current_user.id)
-        else:
-            community.is_joined = False
+        community.is_joined = community.id in joined_ids
     
     return render_template('communities.html', communities=all_communities)
 
@@ -269,23 +248,15 @@ def community_detail(community_id):
 @login_required
 def join_community(community_id):
     """Join a community"""
-    from models import Community, CommunityMember
+    from models import Community
     
     community = Community.query.get_or_404(community_id)
     
-    # Check if already a member
-    if community.is_member(current_user.id):
+    # Create membership (atomic; duplicate joins are ignored)
+    if not community_manager.join(community_id, current_user.id):
         flash('You are already a member of this community.', 'info')
         return redirect(url_for('main.community_detail', community_id=community_id))
     
-    # Create membership
-    membership = CommunityMember(
-        user_id=current_user.id,
-        community_id=community_id
-    )
-    db.session.add(membership)
-    db.session.commit()
-    
     flash(f'Successfully joined {community.name}!', 'success')
     return redirect(url_for('main.community_detail', community_id=community_id))
 
@@ -294,24 +265,15 @@ def join_community(community_id):
 @login_required
 def leave_community(community_id):
     """Leave a community"""
-    from models import Community, CommunityMember
+    from models import Community
     
     community = Community.query.get_or_404(community_id)
     
-    # Find membership
-    membership = CommunityMember.query.filter_by(
-        user_id=current_user.id,
-        community_id=community_id
-    ).first()
-    
-    if not membership:
+    # Remove membership (atomic; count only changes if a row was deleted)
+    if not community_manager.leave(community_id, current_user.id):
         flash('You are not a member of this community.', 'warning')
         return redirect(url_for('main.community_detail', community_id=community_id))
     
-    # Remove membership
-    db.session.delete(membership)
-    db.session.commit()
-    
     flash(f'You have left {community.name}.', 'info')
     return redirect(url_for('main.communities'))
 
@@ -510,7 +472,9 @@ def browse():
     - category: Category ID
     - min_price: Minimum price
     - max_price: Maximum price
-    - sort: Sort option (price_asc, price_desc, rating, newest)
+    - sort: Sort option (price_asc, price_desc, rating, newest, relevance)
+      'relevance' keeps the BM25 search ranking
+    - cursor: Opaque position of the next page (from next_cursor)
     
     Returns:
         Rendered template with services
@@ -521,6 +485,7 @@ def browse():
     min_price = request.args.get('min_price', type=float)
     max_price = request.args.get('max_price', type=float)
     sort_by = request.args.get('sort', 'rating')
+    cursor = request.args.get('cursor')
     
     # Auto-detect category from search query if not explicitly set
     # If query matches a category name, use category filter instead of text search
@@ -544,22 +509,12 @@ def browse():
     if max_price:
         filters['max_price'] = max_price
     
-    # Search services
-    if query or filters:
-        services = service_manager.search_services(query, filters)
-    else:
-        # Get all services
-        services = Service.query.filter_by(is_active=True).all()
-    
-    # Sort services
-    if sort_by == 'price_asc':
-        services.sort(key=lambda s: s.price)
-    elif sort_by == 'price_desc':
-        services.sort(key=lambda s: s.price, reverse=True)
-    elif sort_by == 'rating':
-        services.sort(key=lambda s: s.get_average_rating(), reverse=True)
-    elif sort_by == 'newest':
-        services.sort(key=lambda s: s.created_at, reverse=True)
+    # Search, sort and paginate in the database (one page per request)
+    services, next_cursor = service_manager.browse_services(
+        query, filters, sort_by,
+        cursor=cursor,
+        per_page=current_app.config['ITEMS_PER_PAGE']
+    )
     
     # Get categories for filter
     categories = category_manager.get_all_categories()
@@ -571,7 +526,8 @@ def browse():
                          selected_category=category_id,
                          min_price=min_price,
                          max_price=max_price,
-                         sort_by=sort_by)
+                         sort_by=sort_by,
+                         next_cursor=next_cursor)
 
 
 
@@ -763,8 +719,10 @@ def delete(service_id):
                 Message.query.filter_by(order_id=order.id).delete()
                 db.session.delete(order)
             
-            # Delete related reviews
-            Review.query.filter_by(service_id=service_id).delete()
+            # Delete related reviews (bulk delete: adjust the site counter by hand)
+            from site_counters import adjust_counter
+            deleted_reviews = Review.query.filter_by(service_id=service_id).delete()
+            adjust_counter('reviews', -deleted_reviews)
             
             # Delete related favorites
             Favorite.query.filter_by(service_id=service_id).delete()
@@ -997,8 +955,12 @@ def order_detail(order_id):
         flash('Unauthorized access', 'danger')
         return redirect(url_for('user.dashboard'))
         
-    messages = chat_manager.get_messages(order_id, current_user.id)
-    return render_template('user/order_detail.html', order=order, messages=messages)
+    # Latest page of the chat; ?before=<cursor> loads older messages
+    messages, older_cursor = chat_manager.get_history(
+        order_id, current_user.id, before=request.args.get('before')
+    )
+    return render_template('user/order_detail.html', order=order, messages=messages,
+                           older_cursor=older_cursor)
 
 @user_bp.route('/order/<int:order_id>/action/<action>', methods=['POST'])
 @login_required
@@ -1603,6 +1565,52 @@ def dashboard():
                          recent_orders=recent_orders)
 
 
+@admin_bp.route('/cache-stats')
+@admin_required
+def cache_stats():
+    """
+    Cache hit/miss metrics for every manager cache namespace
+    (and the chat authorization cache)
+    
+    Returns:
+        JSON: Backend info and per-namespace counters
+    """
+    from cache import cache_metrics
+    from chat_access import chat_access
+    metrics = cache_metrics()
+    metrics['chat_access'] = chat_access.metrics()
+    return jsonify(metrics)
+
+
+@admin_bp.route('/chat-writer')
+@admin_required
+def chat_writer_stats():
+    """
+    Write-behind chat persistence metrics
+    
+    Returns:
+        JSON: Pending messages, batch sizes and enqueue-to-commit latency
+    """
+    from chat_writer import chat_writer
+    return jsonify(chat_writer.metrics())
+
+
+@admin_bp.route('/notification-retention')
+@admin_required
+def notification_retention():
+    """
+    Notification retention job metrics
+    
+    Returns:
+        JSON: Retention settings and rows pruned
+    """
+    return jsonify({
+        'retention_days': current_app.config.get('NOTIFICATION_RETENTION_DAYS', 90),
+        'batch_size': current_app.config.get('NOTIFICATION_RETENTION_BATCH_SIZE', 1000),
+        **notification_manager.retention_metrics
+    })
+
+
 @admin_bp.route('/users')
 @admin_required
 def users():
@@ -1797,7 +1805,7 @@ def get_service_stats(service_id):
     service = Service.query.get_or_404(service_id)
     
     stats = {
-        'views': service.view_count,
+        'views': service.get_view_count(),
         'rating': service.get_average_rating(),
         'reviews': service.get_review_count(),
         'favorites': service.favorited_by.count()
@@ -1810,40 +1818,23 @@ def get_service_stats(service_id):
 @login_required
 def get_notifications():
     """
-    Get user notifications for real-time polling
+    Get user notifications
+    
+    New notifications are pushed over Socket.IO ('notification' and
+    'unread_count' events in the user_<id> room); this endpoint is for
+    the initial load and as a slow fallback (poll_interval seconds)
     
     Returns:
         JSON: List of notifications with unread count
     """
-    import pytz
-    from datetime import datetime
-    
     notifications = current_user.get_recent_notifications(10)
     unread_count = current_user.get_unread_notifications_count()
     
-    # Convert to IST for display
-    ist_tz = pytz.timezone('Asia/Kolkata')
-    
-    notifications_data = []
-    for n in notifications:
-        # Convert created_at to IST
-        created_at = n.created_at
-        if created_at.tzinfo is None:
-            utc_tz = pytz.UTC
-            created_at = utc_tz.localize(created_at)
-        ist_time = created_at.astimezone(ist_tz)
-        
-        notifications_data.append({
-            'id': n.id,
-            'title': n.title,
-            'message': n.message,
-            'link': n.link or '#',
-            'is_read': n.is_read,
-            'time': ist_time.strftime('%I:%M %p')
-        })
+    notifications_data = [notification_manager.to_dict(n) for n in notifications]
     
     return jsonify({
         'notifications': notifications_data,
-        'unread_count': unread_count
+        'unread_count': unread_count,
+        'poll_interval': current_app.config['NOTIFICATION_POLL_INTERVAL']
     })
 
@@ -0,0 +1,377 @@
+"""
+Full-Text Search Backends for SkillBridge
+
+This module demonstrates:
+1. OOP Concepts: POLYMORPHISM - every backend exposes the same interface
+2. STRATEGY PATTERN: the backend is chosen once from SQLALCHEMY_DATABASE_URI
+3. DBMS Concepts: Generated columns, GIN indexes, FTS5 virtual tables, Triggers
+
+Backends:
+- PostgresSearchBackend: generated tsvector column + GIN index
+- SQLiteSearchBackend: FTS5 shadow table kept in sync by triggers
+- MemorySearchBackend: the in-process inverted index (any database)
+
+The database backends filter AND rank in SQL, so a search is a single
+indexed query with no Python ranking loop.
+
+Author: SkillBridge Team
+Purpose: Pluggable full-text search for services
+"""
+
+from models import db, Service
+from search_index import tokenize
+
+
+class SearchBackend:
+    """
+    Base class for search backends
+
+    OOP Concept: ABSTRACTION - subclasses implement the search methods
+    """
+
+    name = 'base'
+
+    def ensure_schema(self, engine):
+        """
+        Create the database objects the backend needs (idempotent)
+
+        Args:
+            engine: SQLAlchemy engine
+        """
+
+    def search(self, base_query, text, ranking='default'):
+        """
+        Search services
+
+        Args:
+            base_query: Service query with is_active and filters applied
+            text (str): Search text
+            ranking (str): Ranking mode (only used by MemorySearchBackend)
+
+        Returns:
+            list: Service objects, best match first
+        """
+        raise NotImplementedError
+
+    def match(self, base_query, text):
+        """
+        Restrict a query to services matching the text, in SQL
+
+        Unlike search(), nothing is loaded or ordered: the caller adds
+        ORDER BY, keyset predicates and LIMIT to the same query.
+
+        Args:
+            base_query: Service query with is_active and filters applied
+            text (str): Search text
+
+        Returns:
+            Query: Filtered query, or None if the text has no searchable word
+        """
+        raise NotImplementedError
+
+    def search_tags(self, base_query, tags):
+        """
+        Find services tagged with any of the given tags
+
+        Args:
+            base_query: Service query with is_active applied
+            tags (list): Tag strings
+
+        Returns:
+            list: Matching Service objects
+        """
+        raise NotImplementedError
+
+
+class MemorySearchBackend(SearchBackend):
+    """
+    Search backend over the in-process InvertedIndex
+
+    Used when the database has no usable full-text support, and for the
+    BM25 ranking mode (which needs the index's document statistics).
+    """
+
+    name = 'memory'
+
+    def __init__(self, index_provider):
+        """
+        Args:
+            index_provider (callable): Returns a built InvertedIndex
+        """
+        self._index_provider = index_provider
+
+    def search(self, base_query, text, ranking='default'):
+        """Search with the inverted index, filtering matches in SQL"""
+        index = self._index_provider()
+        scores = index.search_bm25(text) if ranking == 'bm25' else index.search(text)
+        if not scores:
+            return []
+
+        services = base_query.filter(Service.id.in_(list(scores))).all()
+
+        if ranking == 'bm25':
+            services.sort(key=lambda s: scores[s.id], reverse=True)
+        else:
+            # Index score boosted by rating (denormalized column, no query)
+            services.sort(
+                key=lambda s: scores[s.id] + s.get_average_rating(),
+                reverse=True
+            )
+        return services
+
+    def match(self, base_query, text):
+        """
+        Filter by the IDs the inverted index matches
+
+        The index lives in this process, so its matches reach SQL as an
+        ID list; the database backends use a real predicate instead.
+        """
+        if not tokenize(text):
+            return None
+        scores = self._index_provider().search(text)
+        return base_query.filter(Service.id.in_(list(scores)) if scores else db.false())
+
+    def search_tags(self, base_query, tags):
+        """Search the tags field of the inverted index"""
+        service_ids = self._index_provider().search_tags(tags)
+        if not service_ids:
+            return []
+        return base_query.filter(Service.id.in_(list(service_ids))).all()
+
+
+class PostgresSearchBackend(SearchBackend):
+    """
+    PostgreSQL full-text search
+
+    DBMS Concepts:
+    - GENERATED COLUMN: services.search_vector (tsvector) is computed by the
+      database from title (weight A), tags (B) and description (C)
+    - GIN INDEX: makes `search_vector @@ tsquery` an index lookup
+    - ts_rank_cd: ranking done by the database
+    """
+
+    name = 'postgres'
+
+    # Text is normalized like search_index.tokenize (non-alphanumerics -> space)
+    _FIELD_VECTOR = "setweight(to_tsvector('simple', regexp_replace(coalesce({column}, ''), '[^[:alnum:]]+', ' ', 'g')), '{weight}')"
+
+    def ensure_schema(self, engine):
+        """Add the generated tsvector column and its GIN index"""
+        vector = ' || '.join(
+            self._FIELD_VECTOR.format(column=column, weight=weight)
+            for column, weight in (('title', 'A'), ('tags', 'B'), ('description', 'C'))
+        )
+        with engine.begin() as connection:
+            connection.execute(db.text(
+                f"ALTER TABLE services ADD COLUMN IF NOT EXISTS search_vector tsvector "
+                f"GENERATED ALWAYS AS ({vector}) STORED"
+            ))
+            connection.execute(db.text(
+                "CREATE INDEX IF NOT EXISTS idx_services_search_vector "
+                "ON services USING GIN (search_vector)"
+            ))
+
+    @staticmethod
+    def _build_query(tokens, weight=''):
+        """
+        Build a to_tsquery expression (every token as a prefix)
+
+        Tokens only contain [a-z0-9], so they are safe to interpolate.
+        """
+        return ' & '.join(f'{token}:*{weight}' for token in tokens)
+
+    def match(self, base_query, text):
+        """Filter with `search_vector @@ tsquery` (GIN index)"""
+        tokens = tokenize(text)
+        if not tokens:
+            return None
+
+        tsquery = db.func.to_tsquery('simple', self._build_query(tokens))
+        vector = db.literal_column('services.search_vector')
+        return base_query.filter(vector.op('@@')(tsquery))
+
+    def search(self, base_query, text, ranking='default'):
+        """Match and rank in one SQL query"""
+        tokens = tokenize(text)
+        if not tokens:
+            return []
+
+        tsquery = db.func.to_tsquery('simple', self._build_query(tokens))
+        vector = db.literal_column('services.search_vector')
+        return base_query.filter(vector.op('@@')(tsquery))\
+                         .order_by(db.func.ts_rank_cd(vector, tsquery).desc(), Service.id)\
+                         .all()
+
+    def search_tags(self, base_query, tags):
+        """Match tags only (lexemes with weight B)"""
+        alternatives = []
+        for tag in tags:
+            tokens = tokenize(tag)
+            if tokens:
+                alternatives.append(f'({self._build_query(tokens, weight="B")})')
+        if not alternatives:
+            return []
+
+        tsquery = db.func.to_tsquery('simple', ' | '.join(alternatives))
+        vector = db.literal_column('services.search_vector')
+        return base_query.filter(vector.op('@@')(tsquery)).all()
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """
+    SQLite FTS5 full-text search
+
+    DBMS Concepts:
+    - VIRTUAL TABLE: services_fts is an external-content FTS5 index over
+      services (rowid = services.id), so text is not stored twice
+    - TRIGGERS: keep services_fts in sync on INSERT/UPDATE/DELETE
+    - bm25(): ranking done by SQLite with per-column weights
+    """
+
+    name = 'sqlite'
+
+    # bm25() column weights: title, tags, description
+    _RANK_WEIGHTS = (10.0, 5.0, 2.0)
+
+    _TRIGGERS = (
+        """CREATE TRIGGER IF NOT EXISTS services_fts_ai AFTER INSERT ON services BEGIN
+            INSERT INTO services_fts(rowid, title, tags, description)
+            VALUES (new.id, new.title, new.tags, new.description);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS services_fts_ad AFTER DELETE ON services BEGIN
+            INSERT INTO services_fts(services_fts, rowid, title, tags, description)
+            VALUES ('delete', old.id, old.title, old.tags, old.description);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS services_fts_au AFTER UPDATE OF title, tags, description ON services BEGIN
+            INSERT INTO services_fts(services_fts, rowid, title, tags, description)
+            VALUES ('delete', old.id, old.title, old.tags, old.description);
+            INSERT INTO services_fts(rowid, title, tags, description)
+            VALUES (new.id, new.title, new.tags, new.description);
+        END""",
+    )
+
+    def ensure_schema(self, engine):
+        """Create the FTS5 table and triggers, filling the table on first run"""
+        with engine.begin() as connection:
+            exists = connection.execute(db.text(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'services_fts'"
+            )).first()
+            connection.execute(db.text(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS services_fts USING fts5("
+                "title, tags, description, content='services', content_rowid='id')"
+            ))
+            for trigger in self._TRIGGERS:
+                connection.execute(db.text(trigger))
+            if not exists:
+                connection.execute(db.text(
+                    "INSERT INTO services_fts(services_fts) VALUES ('rebuild')"
+                ))
+
+    @staticmethod
+    def _phrase(tokens):
+        """Quote tokens as an FTS5 phrase whose last token is a prefix"""
+        return '"' + ' '.join(tokens) + '" *'
+
+    def _matches(self, expression):
+        """
+        Subquery of (service_id, rank) for an FTS5 MATCH expression
+
+        bm25() returns lower values for better matches.
+        """
+        weights = ', '.join(str(weight) for weight in self._RANK_WEIGHTS)
+        return db.text(
+            f"SELECT rowid AS service_id, bm25(services_fts, {weights}) AS rank "
+            f"FROM services_fts WHERE services_fts MATCH :expression"
+        ).bindparams(expression=expression)\
+         .columns(service_id=db.Integer, rank=db.Float)\
+         .subquery('fts_matches')
+
+    def _match_expression(self, tokens):
+        """MATCH expression requiring every token (as a prefix)"""
+        return ' AND '.join(self._phrase([token]) for token in tokens)
+
+    def match(self, base_query, text):
+        """Join the FTS5 matches (rowid = services.id, at most one row each)"""
+        tokens = tokenize(text)
+        if not tokens:
+            return None
+
+        matches = self._matches(self._match_expression(tokens))
+        return base_query.join(matches, matches.c.service_id == Service.id)
+
+    def search(self, base_query, text, ranking='default'):
+        """Match and rank in one SQL query"""
+        tokens = tokenize(text)
+        if not tokens:
+            return []
+
+        matches = self._matches(self._match_expression(tokens))
+        return base_query.join(matches, matches.c.service_id == Service.id)\
+                         .order_by(matches.c.rank, Service.id)\
+                         .all()
+
+    def search_tags(self, base_query, tags):
+        """Match the tags column only"""
+        phrases = [self._phrase(tokenize(tag)) for tag in tags if tokenize(tag)]
+        if not phrases:
+            return []
+
+        matches = self._matches('tags : (' + ' OR '.join(phrases) + ')')
+        return base_query.join(matches, matches.c.service_id == Service.id).all()
+
+
+def resolve_backend_name(config):
+    """
+    Choose a backend name from configuration
+
+    SEARCH_BACKEND may force 'postgres', 'sqlite' or 'memory';
+    'auto' (default) picks from the SQLALCHEMY_DATABASE_URI scheme.
+
+    Args:
+        config (dict): Flask app config
+
+    Returns:
+        str: Backend name
+    """
+    name = (config.get('SEARCH_BACKEND') or 'auto').lower()
+    if name != 'auto':
+        return name
+
+    uri = (config.get('SQLALCHEMY_DATABASE_URI') or '').lower()
+    if uri.startswith(('postgresql', 'postgres')):
+        return 'postgres'
+    if uri.startswith('sqlite'):
+        return 'sqlite'
+    return 'memory'
+
+
+def create_search_backend(app, engine, memory_backend):
+    """
+    Create and initialize the configured backend
+
+    Falls back to the in-memory backend if the database objects cannot be
+    created (e.g. SQLite built without FTS5, PostgreSQL older than 12).
+
+    Args:
+        app: Flask application
+        engine: SQLAlchemy engine
+        memory_backend (MemorySearchBackend): Fallback backend
+
+    Returns:
+        SearchBackend: Ready-to-use backend
+    """
+    backends = {
+        'postgres': PostgresSearchBackend,
+        'sqlite': SQLiteSearchBackend,
+    }
+    backend_class = backends.get(resolve_backend_name(app.config))
+    if backend_class is None:
+        return memory_backend
+
+    backend = backend_class()
+    try:
+        backend.ensure_schema(engine)
+    except Exception as e:
+        print(f"⚠️  {backend.name} full-text search unavailable, using in-memory index: {e}")
+        return memory_backend
+    return backend
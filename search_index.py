@@ -0,0 +1,591 @@
+"""
+In-Process Search Index for SkillBridge
+
+This module demonstrates:
+1. Data Structures: Inverted Index, Forward Index, Sorted List, Trie
+2. Algorithms: Tokenization, Binary Search (prefix lookup), Posting-list
+   intersection, BM25F ranking, Depth-First Search (autocomplete)
+
+The indexes live in memory (one per worker process), are built once from
+the services table and are kept up to date through model_events, so a
+search costs time proportional to the matching postings rather than the
+catalog, and autocomplete never touches the database.
+
+Author: SkillBridge Team
+Purpose: Fast full-text search over services
+"""
+
+import math
+import re
+import threading
+from bisect import bisect_left, insort
+
+
+# Tokens are runs of lowercase letters and digits ("Node.js" -> node, js)
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+# Indexed fields, in the order used by posting entries
+FIELDS = ('title', 'tags', 'description')
+
+# Field weights (title match counts most, description least)
+FIELD_WEIGHTS = {'title': 10, 'tags': 5, 'description': 2}
+
+# BM25F parameters: per-field boosts, term saturation (k1), length normalization (b)
+BM25_FIELD_BOOSTS = (3.0, 2.0, 1.0)
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Score factor for words that only match a query token as a prefix
+BM25_PREFIX_DISCOUNT = 0.5
+
+
+def tokenize(text):
+    """
+    Split text into lowercase search tokens
+
+    Args:
+        text (str): Raw text
+
+    Returns:
+        list: Token strings (duplicates preserved)
+    """
+    if not text:
+        return []
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class InvertedIndex:
+    """
+    Inverted Index over service titles, tags and descriptions
+
+    Data Structures:
+    - INVERTED INDEX (DICTIONARY): token -> {service_id: field frequencies}
+      where field frequencies is a TUPLE (title_tf, tags_tf, description_tf)
+    - FORWARD INDEX (DICTIONARY): service_id -> SET of tokens, used to
+      remove a document without scanning every posting list
+    - SORTED LIST: vocabulary, searched with bisect for prefix matches
+    - DICTIONARY: service_id -> field lengths, plus running totals, so
+      BM25 document statistics never have to be recomputed
+
+    Time Complexity:
+    - add/remove document: O(t log V) for t distinct tokens
+    - prefix lookup: O(log V + m) for m matching tokens
+    """
+
+    def __init__(self):
+        """Initialize empty index structures"""
+        self._postings = {}
+        self._documents = {}
+        self._vocabulary = []
+        self._field_lengths = {}
+        self._total_lengths = [0, 0, 0]
+        self._lock = threading.RLock()
+        self._built = False
+
+    def is_built(self):
+        """Check if the index has been loaded from the database"""
+        return self._built
+
+    def reset(self):
+        """Drop the contents; the next ensure_built() reloads them"""
+        with self._lock:
+            self._built = False
+
+    def ensure_built(self, loader):
+        """
+        Build the index once
+
+        The lock is held while the loader runs, so changes committed
+        meanwhile are applied after the build instead of being lost.
+
+        Args:
+            loader (callable): Returns rows with id, title, tags, description
+        """
+        if self._built:
+            return
+        with self._lock:
+            if self._built:
+                return
+            self._postings.clear()
+            self._documents.clear()
+            self._vocabulary = []
+            self._field_lengths.clear()
+            self._total_lengths = [0, 0, 0]
+            for row in loader():
+                self.add_document(row.id, row.title, row.tags, row.description)
+            self._built = True
+
+    def add_document(self, service_id, title, tags, description):
+        """
+        Index (or re-index) a service
+
+        Args:
+            service_id (int): Service ID
+            title (str): Service title
+            tags (str): Comma-separated tags
+            description (str): Service description
+        """
+        with self._lock:
+            self.remove_document(service_id)
+
+            # Count term frequency and length per field
+            frequencies = {}
+            lengths = [0, 0, 0]
+            for position, text in enumerate((title, tags, description)):
+                for token in tokenize(text):
+                    counts = frequencies.setdefault(token, [0, 0, 0])
+                    counts[position] += 1
+                    lengths[position] += 1
+
+            for token, counts in frequencies.items():
+                posting = self._postings.get(token)
+                if posting is None:
+                    posting = self._postings[token] = {}
+                    insort(self._vocabulary, token)
+                posting[service_id] = tuple(counts)
+
+            self._documents[service_id] = set(frequencies)
+            self._field_lengths[service_id] = tuple(lengths)
+            for position, length in enumerate(lengths):
+                self._total_lengths[position] += length
+
+    def remove_document(self, service_id):
+        """
+        Remove a service from the index
+
+        Args:
+            service_id (int): Service ID
+        """
+        with self._lock:
+            tokens = self._documents.pop(service_id, None)
+            lengths = self._field_lengths.pop(service_id, None)
+            if lengths:
+                for position, length in enumerate(lengths):
+                    self._total_lengths[position] -= length
+            if not tokens:
+                return
+            for token in tokens:
+                posting = self._postings.get(token)
+                if posting is None:
+                    continue
+                posting.pop(service_id, None)
+                if not posting:
+                    del self._postings[token]
+                    index = bisect_left(self._vocabulary, token)
+                    if index < len(self._vocabulary) and self._vocabulary[index] == token:
+                        del self._vocabulary[index]
+
+    def apply_changes(self, changes):
+        """
+        Apply committed Service changes (model_events subscriber)
+
+        Args:
+            changes (list): Change dictionaries from model_events
+        """
+        with self._lock:
+            if not self._built:
+                # Nothing loaded yet; the first build reads fresh rows
+                return
+            for change in changes:
+                if change['deleted'] or not change['is_active']:
+                    self.remove_document(change['id'])
+                elif change['changed'] & {'title', 'tags', 'description', 'is_active'}:
+                    self.add_document(change['id'], change['title'],
+                                      change['tags'], change['description'])
+
+    def _expand(self, token):
+        """
+        Find indexed tokens starting with the given prefix
+
+        Algorithm: BINARY SEARCH on the sorted vocabulary
+
+        Args:
+            token (str): Query token (treated as a prefix)
+
+        Returns:
+            list: Matching vocabulary tokens
+        """
+        matches = []
+        index = bisect_left(self._vocabulary, token)
+        while index < len(self._vocabulary) and self._vocabulary[index].startswith(token):
+            matches.append(self._vocabulary[index])
+            index += 1
+        return matches
+
+    def search(self, query):
+        """
+        Find services matching every token of the query
+
+        Algorithm:
+        1. Tokenize query (each token also matches longer words as a prefix)
+        2. Merge posting lists of all expansions of a token
+        3. Intersect across tokens, smallest candidate set first
+        4. Score each match with the field weights
+
+        Args:
+            query (str): Search query
+
+        Returns:
+            dict: service_id -> relevance score (empty if nothing matches)
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return {}
+
+        with self._lock:
+            per_token = []
+            for token in tokens:
+                matched = {}
+                for term in self._expand(token):
+                    for service_id, counts in self._postings[term].items():
+                        # Field matched by any expansion of this token
+                        previous = matched.get(service_id, (0, 0, 0))
+                        matched[service_id] = tuple(max(a, b) for a, b in zip(previous, counts))
+                if not matched:
+                    return {}
+                per_token.append(matched)
+
+        # Intersect starting from the rarest token
+        per_token.sort(key=len)
+        candidates = set(per_token[0])
+        for matched in per_token[1:]:
+            candidates.intersection_update(matched)
+            if not candidates:
+                return {}
+
+        scores = {}
+        for service_id in candidates:
+            score = 0
+            for matched in per_token:
+                counts = matched[service_id]
+                for field, count in zip(FIELDS, counts):
+                    if count:
+                        score += FIELD_WEIGHTS[field]
+            scores[service_id] = score
+        return scores
+
+    def search_tags(self, tags):
+        """
+        Find services whose tags contain any of the given tags
+
+        A multi-word tag matches when all of its words occur in the tags
+        field (the last word may be a prefix).
+
+        Args:
+            tags (list): Tag strings
+
+        Returns:
+            set: Matching service IDs
+        """
+        matches = set()
+        with self._lock:
+            for tag in tags:
+                tokens = tokenize(tag)
+                if not tokens:
+                    continue
+                candidates = None
+                for token in tokens:
+                    found = set()
+                    for term in self._expand(token):
+                        found.update(service_id for service_id, counts in self._postings[term].items()
+                                     if counts[1])
+                    candidates = found if candidates is None else candidates & found
+                    if not candidates:
+                        break
+                matches.update(candidates or ())
+        return matches
+
+    def search_bm25(self, query):
+        """
+        Rank services with BM25F (BM25 over weighted fields)
+
+        Algorithm:
+        1. Expand each query token to vocabulary terms (prefix match)
+        2. For every posting, combine field frequencies normalized by
+           field length:  tf = sum(boost * tf_f / (1 - b + b * len_f / avg_f))
+        3. Saturate and weight by rarity:  idf * tf * (k1 + 1) / (k1 + tf)
+        4. Keep the best term per query token (prefix-only matches are
+           discounted), then sum over tokens, so a service matching more
+           query words ranks higher
+
+        Args:
+            query (str): Search query
+
+        Returns:
+            dict: service_id -> BM25 score (empty if nothing matches)
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return {}
+
+        with self._lock:
+            total_documents = len(self._documents)
+            if not total_documents:
+                return {}
+            average_lengths = [max(total / total_documents, 1.0) for total in self._total_lengths]
+
+            scores = {}
+            for token in tokens:
+                token_scores = {}
+                for term in self._expand(token):
+                    posting = self._postings[term]
+                    document_frequency = len(posting)
+                    idf = math.log(1 + (total_documents - document_frequency + 0.5) / (document_frequency + 0.5))
+                    if term != token:
+                        idf *= BM25_PREFIX_DISCOUNT
+
+                    for service_id, counts in posting.items():
+                        lengths = self._field_lengths[service_id]
+                        weighted_tf = 0.0
+                        for boost, count, length, average in zip(BM25_FIELD_BOOSTS, counts, lengths, average_lengths):
+                            if count:
+                                weighted_tf += boost * count / (1 - BM25_B + BM25_B * length / average)
+                        score = idf * weighted_tf * (BM25_K1 + 1) / (BM25_K1 + weighted_tf)
+                        if score > token_scores.get(service_id, 0.0):
+                            token_scores[service_id] = score
+
+                for service_id, score in token_scores.items():
+                    scores[service_id] = scores.get(service_id, 0.0) + score
+
+        return scores
+
+    def __len__(self):
+        """Number of indexed services"""
+        return len(self._documents)
+
+
+class TrieNode:
+    """
+    Node of the autocomplete TRIE
+
+    Data Structures:
+    - DICTIONARY: character -> child TrieNode
+    - DICTIONARY: suggestion text -> reference count (several services can
+      share a tag, and a suggestion disappears only when the last one goes)
+    """
+
+    __slots__ = ('children', 'suggestions')
+
+    def __init__(self):
+        """Initialize an empty node"""
+        self.children = {}
+        self.suggestions = {}
+
+
+class Trie:
+    """
+    Prefix TRIE mapping normalized keys to display suggestions
+
+    Time Complexity:
+    - insert/remove: O(k) for key length k
+    - complete: O(p + n) for prefix length p and n visited nodes
+    """
+
+    def __init__(self):
+        """Initialize trie with an empty root"""
+        self.root = TrieNode()
+
+    def insert(self, key, suggestion):
+        """
+        Add a suggestion under a key
+
+        Args:
+            key (str): Normalized lookup key
+            suggestion (str): Text returned to the user
+        """
+        node = self.root
+        for char in key:
+            node = node.children.setdefault(char, TrieNode())
+        node.suggestions[suggestion] = node.suggestions.get(suggestion, 0) + 1
+
+    def remove(self, key, suggestion):
+        """
+        Remove one reference of a suggestion and prune empty nodes
+
+        Args:
+            key (str): Normalized lookup key
+            suggestion (str): Text returned to the user
+        """
+        path = [self.root]
+        for char in key:
+            node = path[-1].children.get(char)
+            if node is None:
+                return
+            path.append(node)
+
+        node = path[-1]
+        count = node.suggestions.get(suggestion, 0)
+        if count <= 1:
+            node.suggestions.pop(suggestion, None)
+        else:
+            node.suggestions[suggestion] = count - 1
+
+        # Walk back up, dropping nodes that no longer lead anywhere
+        for depth in range(len(key), 0, -1):
+            node = path[depth]
+            if node.children or node.suggestions:
+                break
+            del path[depth - 1].children[key[depth - 1]]
+
+    def complete(self, prefix, limit):
+        """
+        Collect suggestions whose key starts with the prefix
+
+        Algorithm: DEPTH-FIRST SEARCH in key order, stopping as soon as
+        enough distinct suggestions are found
+
+        Args:
+            prefix (str): Normalized prefix
+            limit (int): Maximum number of suggestions
+
+        Returns:
+            list: Sorted suggestion strings
+        """
+        node = self.root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return []
+
+        found = set()
+        stack = [node]
+        while stack and len(found) < limit:
+            node = stack.pop()
+            for suggestion in node.suggestions:
+                found.add(suggestion)
+                if len(found) >= limit:
+                    break
+            # Push children in reverse so the smallest key is visited first
+            stack.extend(node.children[char] for char in sorted(node.children, reverse=True))
+
+        return sorted(found)
+
+
+class AutocompleteIndex:
+    """
+    Autocomplete index of service titles and tags
+
+    Every title and tag is inserted once per word position, so typing any
+    word of a title ("deve" for "Website Development") finds it.
+
+    Data Structures:
+    - TRIE: normalized key -> suggestions
+    - DICTIONARY: service_id -> LIST of (key, suggestion) entries, used to
+      update or remove a service incrementally
+    """
+
+    def __init__(self):
+        """Initialize empty trie"""
+        self._trie = Trie()
+        self._entries = {}
+        self._lock = threading.RLock()
+        self._built = False
+
+    @staticmethod
+    def normalize(text):
+        """
+        Normalize text to a trie key (lowercase tokens joined by spaces)
+
+        Args:
+            text (str): Raw text
+
+        Returns:
+            str: Normalized key
+        """
+        return ' '.join(tokenize(text))
+
+    def is_built(self):
+        """Check if the trie has been loaded from the database"""
+        return self._built
+
+    def reset(self):
+        """Drop the contents; the next ensure_built() reloads them"""
+        with self._lock:
+            self._built = False
+
+    def ensure_built(self, loader):
+        """
+        Build the trie once
+
+        Args:
+            loader (callable): Returns rows with id, title, tags
+        """
+        if self._built:
+            return
+        with self._lock:
+            if self._built:
+                return
+            self._trie = Trie()
+            self._entries.clear()
+            for row in loader():
+                self.add_service(row.id, row.title, row.tags)
+            self._built = True
+
+    def add_service(self, service_id, title, tags):
+        """
+        Insert (or re-insert) a service's title and tags
+
+        Args:
+            service_id (int): Service ID
+            title (str): Service title
+            tags (str): Comma-separated tags
+        """
+        phrases = [title] if title else []
+        if tags:
+            phrases.extend(tag.strip() for tag in tags.split(',') if tag.strip())
+
+        entries = []
+        for phrase in phrases:
+            words = tokenize(phrase)
+            for start in range(len(words)):
+                entries.append((' '.join(words[start:]), phrase))
+
+        with self._lock:
+            self.remove_service(service_id)
+            for key, suggestion in entries:
+                self._trie.insert(key, suggestion)
+            self._entries[service_id] = entries
+
+    def remove_service(self, service_id):
+        """
+        Remove a service's suggestions
+
+        Args:
+            service_id (int): Service ID
+        """
+        with self._lock:
+            for key, suggestion in self._entries.pop(service_id, ()):
+                self._trie.remove(key, suggestion)
+
+    def apply_changes(self, changes):
+        """
+        Apply committed Service changes (model_events subscriber)
+
+        Args:
+            changes (list): Change dictionaries from model_events
+        """
+        with self._lock:
+            if not self._built:
+                return
+            for change in changes:
+                if change['deleted'] or not change['is_active']:
+                    self.remove_service(change['id'])
+                elif change['changed'] & {'title', 'tags', 'is_active'}:
+                    self.add_service(change['id'], change['title'], change['tags'])
+
+    def suggest(self, query, limit=5):
+        """
+        Get suggestions for a partial query
+
+        Args:
+            query (str): Partial search text
+            limit (int): Maximum suggestions
+
+        Returns:
+            list: Sorted suggestion strings
+        """
+        prefix = self.normalize(query)
+        if not prefix:
+            return []
+        with self._lock:
+            return self._trie.complete(prefix, limit)
@@ -0,0 +1,286 @@
+"""
+Materialized Site-Wide Counters for SkillBridge
+
+The home and about pages show totals (users, active services, reviews,
+website feedback). Instead of COUNT(*) on every render, the totals live
+in the site_counters table:
+- Mapper events adjust a counter inside the same flush as the write,
+  with an atomic `UPDATE ... SET value = value + delta`, so counts commit
+  or roll back together with the rows they describe
+- Bulk statements bypass mapper events; callers use adjust_counter(),
+  and a periodic reconcile recomputes everything from the real tables
+  (other denormalized counters register their own reconcile jobs with
+  add_reconcile_job)
+
+Counters:
+- users, active_services, reviews
+- website_reviews, website_rating_sum (approved website feedback)
+
+Author: SkillBridge Team
+Purpose: O(1) site statistics
+"""
+
+from sqlalchemy import event, inspect
+from sqlalchemy.exc import IntegrityError
+from extensions import socketio
+from models import db, User, Service, Review, WebsiteReview, SiteCounter
+
+
+COUNTERS = ('users', 'active_services', 'reviews', 'website_reviews', 'website_rating_sum')
+
+# Extra reconcile jobs run with the site counters (LIST of callables)
+_reconcile_jobs = []
+
+
+def add_reconcile_job(job):
+    """
+    Run a reconcile function on the same schedule as the site counters
+    (in the background task only, see start_reconciler)
+
+    Args:
+        job (callable): Called inside an application context
+
+    Returns:
+        callable: The same job
+    """
+    _reconcile_jobs.append(job)
+    return job
+
+
+def _count_queries():
+    """
+    Build the query that computes each counter from the source tables
+
+    Returns:
+        dict: counter name -> scalar SELECT
+    """
+    approved = WebsiteReview.is_approved == True
+    return {
+        'users': db.select(db.func.count(User.id)),
+        'active_services': db.select(db.func.count(Service.id)).where(Service.is_active == True),
+        'reviews': db.select(db.func.count(Review.id)),
+        'website_reviews': db.select(db.func.count(WebsiteReview.id)).where(approved),
+        'website_rating_sum': db.select(
+            db.func.coalesce(db.func.sum(WebsiteReview.rating), 0)
+        ).where(approved),
+    }
+
+
+def reconcile_counters():
+    """
+    Recompute every counter and store it (corrects any drift)
+
+    Algorithm: lock the counter rows (SELECT ... FOR UPDATE), then one
+    `UPDATE site_counters SET value = (SELECT COUNT(*) ...)` per counter.
+    Increments run in the transaction that writes the counted rows and
+    need the same row lock, so once the lock is held every increment has
+    either committed (and its row is visible to the UPDATE's count) or
+    waits and applies on top of the recount. Missing rows are created
+    first.
+
+    Must be called inside an application context.
+
+    Returns:
+        dict: counter name -> value
+    """
+    queries = _count_queries()
+    existing = {name for (name,) in db.session.query(SiteCounter.name)}
+    for name in queries:
+        if name not in existing:
+            db.session.add(SiteCounter(name=name, value=0))
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()  # created concurrently by another worker
+
+    table = SiteCounter.__table__
+    db.session.execute(
+        db.select(table.c.name).where(table.c.name.in_(list(queries))).with_for_update()
+    )
+    for name, query in queries.items():
+        db.session.execute(
+            table.update().where(table.c.name == name).values(value=query.scalar_subquery())
+        )
+    db.session.commit()
+    return {name: value for name, value in get_counters().items() if name in queries}
+
+
+def get_counters():
+    """
+    Read all counters in one primary-key table scan (a handful of rows)
+
+    Returns:
+        dict: counter name -> value (0 for counters not created yet)
+    """
+    values = dict.fromkeys(COUNTERS, 0)
+    values.update(db.session.query(SiteCounter.name, SiteCounter.value).all())
+    return values
+
+
+def adjust_counter(name, delta, connection=None):
+    """
+    Atomically add `delta` to a counter
+
+    Args:
+        name (str): Counter name
+        delta (int): Amount to add (negative to subtract)
+        connection: Connection to run on (default: the current session,
+                    so the change commits with the caller's transaction)
+    """
+    if not delta:
+        return
+    table = SiteCounter.__table__
+    statement = table.update()\
+        .where(table.c.name == name)\
+        .values(value=table.c.value + delta)
+    if connection is None:
+        db.session.execute(statement)
+    else:
+        connection.execute(statement)
+
+
+def _load_old_value(target, value, oldvalue, initiator):
+    """No-op set listener; registering it with active_history=True makes
+    SQLAlchemy load the previous value, so updates know what changed"""
+    return value
+
+
+for _attribute in (Service.is_active, WebsiteReview.is_approved, WebsiteReview.rating):
+    event.listen(_attribute, 'set', _load_old_value, active_history=True, retval=True)
+
+
+def _old_and_new(target, attribute):
+    """
+    Get an attribute's value before and after the flush
+
+    Returns:
+        tuple: (old value, new value)
+    """
+    history = inspect(target).attrs[attribute].history
+    new = getattr(target, attribute)
+    old = history.deleted[0] if history.deleted else new
+    return old, new
+
+
+# Users
+
+@event.listens_for(User, 'after_insert')
+def _user_inserted(mapper, connection, target):
+    adjust_counter('users', 1, connection)
+
+
+@event.listens_for(User, 'after_delete')
+def _user_deleted(mapper, connection, target):
+    adjust_counter('users', -1, connection)
+
+
+# Services (active only)
+
+@event.listens_for(Service, 'after_insert')
+def _service_inserted(mapper, connection, target):
+    if target.is_active is not False:
+        adjust_counter('active_services', 1, connection)
+
+
+@event.listens_for(Service, 'after_update')
+def _service_updated(mapper, connection, target):
+    was_active, is_active = _old_and_new(target, 'is_active')
+    if bool(was_active) != bool(is_active):
+        adjust_counter('active_services', 1 if is_active else -1, connection)
+
+
+@event.listens_for(Service, 'after_delete')
+def _service_deleted(mapper, connection, target):
+    was_active, _ = _old_and_new(target, 'is_active')
+    if was_active:
+        adjust_counter('active_services', -1, connection)
+
+
+# Reviews
+
+@event.listens_for(Review, 'after_insert')
+def _review_inserted(mapper, connection, target):
+    adjust_counter('reviews', 1, connection)
+
+
+@event.listens_for(Review, 'after_delete')
+def _review_deleted(mapper, connection, target):
+    adjust_counter('reviews', -1, connection)
+
+
+# Website reviews (approved only)
+
+def _website_contribution(is_approved, rating):
+    """Counter contribution of one website review: (count, rating sum)"""
+    if is_approved is False:
+        return 0, 0
+    return 1, rating or 0
+
+
+@event.listens_for(WebsiteReview, 'after_insert')
+def _website_review_inserted(mapper, connection, target):
+    count, rating = _website_contribution(target.is_approved, target.rating)
+    adjust_counter('website_reviews', count, connection)
+    adjust_counter('website_rating_sum', rating, connection)
+
+
+@event.listens_for(WebsiteReview, 'after_update')
+def _website_review_updated(mapper, connection, target):
+    old_approved, new_approved = _old_and_new(target, 'is_approved')
+    old_rating, new_rating = _old_and_new(target, 'rating')
+    old_count, old_sum = _website_contribution(old_approved, old_rating)
+    new_count, new_sum = _website_contribution(new_approved, new_rating)
+    adjust_counter('website_reviews', new_count - old_count, connection)
+    adjust_counter('website_rating_sum', new_sum - old_sum, connection)
+
+
+@event.listens_for(WebsiteReview, 'after_delete')
+def _website_review_deleted(mapper, connection, target):
+    old_approved, _ = _old_and_new(target, 'is_approved')
+    old_rating, _ = _old_and_new(target, 'rating')
+    count, rating = _website_contribution(old_approved, old_rating)
+    adjust_counter('website_reviews', -count, connection)
+    adjust_counter('website_rating_sum', -rating, connection)
+
+
+# Periodic reconcile
+
+def start_reconciler(app):
+    """
+    Reconcile the site counters now, and start the background task that
+    reconciles them (and runs the registered jobs) periodically
+
+    Registered jobs (unread counters, notification retention) can take a
+    while on a large database, so they never run inside create_app():
+    their first run is RECONCILE_JOBS_DELAY seconds after startup, in the
+    background task, then every SITE_COUNTER_RECONCILE_INTERVAL seconds
+    with the counters (interval 0 = once). migrations.py runs each of
+    them on demand, e.g. from a scheduled command.
+
+    Args:
+        app: Flask application
+    """
+    interval = app.config.get('SITE_COUNTER_RECONCILE_INTERVAL', 3600)
+    delay = app.config.get('RECONCILE_JOBS_DELAY', 60)
+
+    def reconcile(jobs):
+        with app.app_context():
+            for job in jobs:
+                try:
+                    job()
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"⚠️  Reconcile job {job.__name__} failed: {e}")
+            db.session.remove()
+
+    def run():
+        socketio.sleep(delay)
+        reconcile(list(_reconcile_jobs))
+        elapsed = delay
+        while interval:
+            socketio.sleep(max(interval - elapsed, 0))
+            elapsed = 0
+            reconcile([reconcile_counters] + _reconcile_jobs)
+
+    reconcile([reconcile_counters])
+    socketio.start_background_task(run)
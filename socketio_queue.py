@@ -0,0 +1,140 @@
+"""
+Socket.IO Message Queue Configuration for SkillBridge
+
+Each gunicorn worker runs its own Socket.IO server and only knows the
+clients connected to it. With several workers, an emit to a room such
+as order_<id> or user_<id> must travel through a message queue so the
+worker holding each client delivers it.
+
+SOCKETIO_MESSAGE_QUEUE selects the queue:
+- unset: no queue (a single worker process only)
+- 'redis://...', 'amqp://...', 'kafka://...', 'zmq+tcp://...': handed
+  to Flask-SocketIO, which uses python-socketio's manager for the scheme
+  (the matching client library must be installed)
+- 'loopback://': LoopbackPubSubManager, an in-process stand-in that
+  fans out between Socket.IO servers of the same process (tests and
+  local experiments; Flask-SocketIO's test client refuses any queue,
+  so use real servers and socketio.Client)
+
+Author: SkillBridge Team
+Purpose: Fan Socket.IO rooms out across workers
+"""
+
+import queue
+import threading
+import socketio as python_socketio
+
+
+LOOPBACK_SCHEME = 'loopback://'
+
+
+class LoopbackBroker:
+    """
+    In-process publish/subscribe broker
+
+    Data Structure: DICTIONARY channel -> LIST of subscriber queues;
+    every published message is copied to each subscriber of the channel
+    """
+
+    def __init__(self):
+        self._subscribers = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, channel):
+        """
+        Start receiving a channel's messages
+
+        Args:
+            channel (str): Channel name
+
+        Returns:
+            queue.Queue: Receives every message published afterwards
+        """
+        inbox = queue.Queue()
+        with self._lock:
+            self._subscribers.setdefault(channel, []).append(inbox)
+        return inbox
+
+    def publish(self, channel, message):
+        """
+        Deliver a message to every subscriber of a channel
+
+        Args:
+            channel (str): Channel name
+            message (str): Encoded message
+        """
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for inbox in subscribers:
+            inbox.put(message)
+
+
+# Broker shared by every loopback manager in this process
+loopback_broker = LoopbackBroker()
+
+
+class LoopbackPubSubManager(python_socketio.PubSubManager):
+    """
+    Socket.IO client manager backed by LoopbackBroker
+
+    OOP Concept: INHERITANCE - python-socketio's PubSubManager handles
+    rooms and emits; this class only supplies _publish and _listen, like
+    its Redis and Kombu siblings
+    """
+
+    name = 'loopback'
+
+    def __init__(self, url=LOOPBACK_SCHEME, channel='flask-socketio', write_only=False,
+                 logger=None, json=None, broker=None):
+        """
+        Args:
+            url (str): Ignored (always loopback://), for a uniform signature
+            channel (str): Channel shared by the cooperating servers
+            write_only (bool): Only emit (no listening)
+            broker (LoopbackBroker): Broker to use (default: the process broker)
+        """
+        super().__init__(channel=channel, write_only=write_only, logger=logger, json=json)
+        self.broker = broker or loopback_broker
+        self._inbox = None if write_only else self.broker.subscribe(channel)
+
+    def _publish(self, data):
+        """Send a message to the other servers on the channel"""
+        self.broker.publish(self.channel, self.json.dumps(data))
+
+    def _listen(self):
+        """Yield messages published on the channel (blocks)"""
+        while True:
+            yield self._inbox.get()
+
+
+def socketio_options(config):
+    """
+    Build the socketio.init_app() keyword arguments for the configured
+    message queue
+
+    Args:
+        config (dict): Flask app config (SOCKETIO_MESSAGE_QUEUE, SOCKETIO_CHANNEL)
+
+    Returns:
+        dict: Keyword arguments (empty for a single-process deployment)
+    """
+    url = config.get('SOCKETIO_MESSAGE_QUEUE')
+    channel = config.get('SOCKETIO_CHANNEL') or 'flask-socketio'
+    if not url:
+        return {}
+    if url.startswith(LOOPBACK_SCHEME):
+        return {'client_manager': LoopbackPubSubManager(url, channel=channel)}
+    return {'message_queue': url, 'channel': channel}
+
+
+def describe_queue(config):
+    """
+    Describe the configured fan-out for the startup log
+
+    Returns:
+        str: Scheme of the message queue, or 'none (single worker)'
+    """
+    url = config.get('SOCKETIO_MESSAGE_QUEUE')
+    if not url:
+        return 'none (single worker)'
+    return url.split('://', 1)[0]
@@ -0,0 +1,51 @@
+"""
+Shared pytest fixtures for SkillBridge
+
+One application (TestingConfig: in-memory SQLite, no invalidation bus)
+is created per test session, because the manager singletons and event
+listeners are process-wide.
+"""
+
+import os
+import sys
+import uuid
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from models import db, User, Service, Category
+
+
+@pytest.fixture(scope='session')
+def app():
+    """Application for the whole test session"""
+    return create_app('testing')
+
+
+@pytest.fixture
+def app_context(app):
+    """Application context with a clean session afterwards"""
+    with app.app_context():
+        yield app
+        db.session.rollback()
+        db.session.remove()
+
+
+def make_user(user_type='client'):
+    """Create and commit a user with a unique name"""
+    name = uuid.uuid4().hex[:12]
+    user = User(username=name, email=f'{name}@example.com', user_type=user_type)
+    user.set_password('password')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def make_service(provider, title='Test service'):
+    """Create and commit an active service"""
+    service = Service(title=title, description='description', price=10,
+                      user_id=provider.id, category_id=Category.query.first().id)
+    db.session.add(service)
+    db.session.commit()
+    return service
@@ -0,0 +1,20 @@
+"""Tests for the cached category stats used by the home page"""
+
+import uuid
+from managers import category_manager
+from models import Category
+
+
+def test_category_stats_list_every_category_from_the_cache(app_context):
+    name = f'Category {uuid.uuid4().hex[:8]}'
+    category_manager.create_category(name, description='Things', icon='bi-x', color='blue')
+
+    stats = category_manager.get_category_stats()
+    assert [row['id'] for row in stats] == [c.id for c in Category.query.order_by(Category.id)]
+    row = next(row for row in stats if row['name'] == name)
+    assert row['description'] == 'Things'
+    assert row['service_count'] == 0
+
+    hits = category_manager._cache.hits
+    assert category_manager.get_category_stats() == stats
+    assert category_manager._cache.hits == hits + 1
@@ -0,0 +1,72 @@
+"""Tests for the cross-worker invalidation bus (no real transport)"""
+
+import json
+from conftest import make_user, make_service
+from invalidation_bus import InvalidationBus, RESYNC
+from model_events import summarize_service_changes, load_service_changes
+from models import db
+
+
+class FakeTransport:
+    """Records sent messages; fails while `failing` is set"""
+
+    name = 'fake'
+    max_payload = 200
+
+    def __init__(self):
+        self.sent = []
+        self.failing = False
+
+    def send(self, data):
+        if self.failing:
+            raise OSError('connection lost')
+        self.sent.append(json.loads(data))
+
+
+def make_bus():
+    bus = InvalidationBus()
+    bus._transport = FakeTransport()
+    return bus
+
+
+def test_service_changes_carry_no_row_contents(app_context):
+    service = make_service(make_user('provider'))
+    service.description = 'x' * 10000
+    db.session.commit()
+
+    change = {'id': service.id, 'deleted': False, 'changed': {'description'},
+              'description': service.description}
+    summaries = summarize_service_changes([change])
+    assert summaries == [{'id': service.id, 'deleted': False, 'changed': ['description']}]
+
+    loaded = load_service_changes(summaries + [{'id': -1, 'deleted': False, 'changed': ['title']}])
+    assert loaded[0]['description'] == 'x' * 10000
+    assert loaded[0]['changed'] == {'description'}
+    assert loaded[1]['deleted'] is True
+
+
+def test_oversized_message_becomes_resync():
+    bus = make_bus()
+    bus.publish('cache', {'namespace': 'services', 'key': 'k' * 500})
+    assert [message['k'] for message in bus._transport.sent] == [RESYNC]
+
+
+def test_failed_send_requests_resync_on_next_publish():
+    bus = make_bus()
+    bus._transport.failing = True
+    bus.publish('order_access', [1])
+    assert bus._transport.sent == []
+
+    bus._transport.failing = False
+    bus.publish('order_access', [2])
+    assert [message['k'] for message in bus._transport.sent] == [RESYNC, 'order_access']
+    assert not bus._resync_pending
+
+
+def test_received_resync_runs_reconnect_callbacks(app):
+    bus = make_bus()
+    bus._app = app
+    calls = []
+    bus.on_reconnect(lambda: calls.append(True))
+    bus._deliver(json.dumps({'o': 'another-worker', 'k': RESYNC}).encode())
+    assert calls == [True]
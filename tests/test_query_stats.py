@@ -0,0 +1,33 @@
+"""Tests for N+1 call-site attribution in query_stats"""
+
+import os
+import query_stats
+
+
+def _library_frames(depth, callback):
+    """Run callback beneath `depth` frames whose code lives in a project-local venv"""
+    filename = os.path.join(query_stats._APP_ROOT, 'venv', 'lib', 'python3.11',
+                            'site-packages', 'sqlalchemy', 'orm', 'query.py')
+    source = ('def library_call(depth, callback):\n'
+              '    if depth:\n'
+              '        return library_call(depth - 1, callback)\n'
+              '    return callback()\n')
+    namespace = {}
+    exec(compile(source, filename, 'exec'), namespace)
+    return namespace['library_call'](depth, callback)
+
+
+def test_call_sites_skip_project_local_venv():
+    sites = _library_frames(5, query_stats._call_sites)
+
+    assert sites, 'the test module itself is application code'
+    assert not any('site-packages' in site for site in sites)
+    assert sites[0].startswith(os.path.join('tests', 'test_query_stats.py'))
+
+
+def test_is_app_file():
+    root = query_stats._APP_ROOT
+    assert query_stats._is_app_file(os.path.join(root, 'managers.py'))
+    assert not query_stats._is_app_file(os.path.join(root, '.venv', 'lib', 'site-packages', 'flask', 'app.py'))
+    assert not query_stats._is_app_file(query_stats._THIS_FILE)
+    assert not query_stats._is_app_file(root + '-other' + os.sep + 'module.py')
@@ -0,0 +1,30 @@
+"""Tests for ReviewSystem rating aggregates and distributions"""
+
+from conftest import make_user, make_service
+from managers import review_system
+
+
+def test_rating_distributions_for_several_services(app_context):
+    provider = make_user('provider')
+    reviewed = make_service(provider, 'Reviewed')
+    other = make_service(provider, 'Other')
+    unreviewed = make_service(provider, 'Unreviewed')
+
+    for rating in (5, 5, 3):
+        review_system.add_review(reviewed.id, make_user().id, rating, 'ok')
+    review_system.add_review(other.id, make_user().id, 1, 'bad')
+
+    distributions = review_system.calculate_rating_distributions(
+        [reviewed.id, other.id, unreviewed.id]
+    )
+
+    assert distributions == {
+        reviewed.id: {1: 0, 2: 0, 3: 1, 4: 0, 5: 2},
+        other.id: {1: 1, 2: 0, 3: 0, 4: 0, 5: 0},
+        unreviewed.id: {1: 0, 2: 0, 3: 0, 4: 0, 5: 0},
+    }
+    assert review_system.calculate_rating_distribution(reviewed.id) == distributions[reviewed.id]
+
+
+def test_rating_distributions_without_services(app_context):
+    assert review_system.calculate_rating_distributions([]) == {}
@@ -0,0 +1,124 @@
+"""
+Buffered Service View Counter for SkillBridge
+
+Page views are counted in memory and written to the database in
+batches, instead of one read-modify-write commit per page view.
+
+Design:
+- DICTIONARY service_id -> pending increment, guarded by a lock
+- A background task flushes the buffer every VIEW_FLUSH_INTERVAL seconds
+  as one executemany of `UPDATE services SET view_count = view_count + n`
+  (atomic in the database, so concurrent workers never lose increments)
+- The buffer is flushed once more when the process exits
+- Failed flushes put their increments back into the buffer
+
+Author: SkillBridge Team
+Purpose: Take view counting off the request path
+"""
+
+import atexit
+import threading
+from extensions import socketio
+
+
+class ViewCounter:
+    """
+    In-memory view-count buffer with periodic batch flushes
+    """
+
+    def __init__(self):
+        self._pending = {}   # service_id -> views not yet written
+        self._lock = threading.Lock()
+        self._app = None
+
+    def record(self, service_id):
+        """
+        Count one view (O(1), no database access)
+
+        Args:
+            service_id (int): Service ID
+        """
+        with self._lock:
+            self._pending[service_id] = self._pending.get(service_id, 0) + 1
+
+    def pending(self, service_id):
+        """
+        Get views recorded but not yet flushed
+
+        Args:
+            service_id (int): Service ID
+
+        Returns:
+            int: Buffered view count
+        """
+        with self._lock:
+            return self._pending.get(service_id, 0)
+
+    def flush(self):
+        """
+        Write buffered views to the database in one batch
+
+        Must be called inside an application context.
+
+        Returns:
+            int: Number of services updated
+        """
+        from models import db, Service
+
+        with self._lock:
+            batch, self._pending = self._pending, {}
+        if not batch:
+            return 0
+
+        services = Service.__table__
+        statement = db.update(services)\
+            .where(services.c.id == db.bindparam('service_id'))\
+            .values(view_count=db.func.coalesce(services.c.view_count, 0) + db.bindparam('views'))
+        rows = [{'service_id': service_id, 'views': views}
+                for service_id, views in batch.items()]
+
+        try:
+            db.session.execute(statement, rows)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            # Keep the increments for the next flush
+            with self._lock:
+                for service_id, views in batch.items():
+                    self._pending[service_id] = self._pending.get(service_id, 0) + views
+            print(f"⚠️  View count flush failed: {e}")
+            return 0
+        return len(rows)
+
+    def _flush_in_app(self):
+        """Flush inside the application context"""
+        from models import db
+
+        with self._app.app_context():
+            try:
+                self.flush()
+            finally:
+                db.session.remove()
+
+    def _run(self, interval):
+        """Background task: flush every `interval` seconds"""
+        while True:
+            socketio.sleep(interval)
+            self._flush_in_app()
+
+    def start(self, app):
+        """
+        Start periodic flushing and register the exit flush
+
+        Args:
+            app: Flask application (VIEW_FLUSH_INTERVAL config, seconds)
+        """
+        if self._app is not None:
+            return
+        self._app = app
+        socketio.start_background_task(self._run, app.config.get('VIEW_FLUSH_INTERVAL', 30))
+        atexit.register(self._flush_in_app)
+
+
+# Singleton buffer shared by every request in this process
+view_counter = ViewCounter()